@@ -10,6 +10,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Lifetime of the CSRF cookie (1 hour)
+CSRF_TOKEN_MAX_AGE = 3600
+
 
 @router.get("/csrf-token")
 async def get_csrf_token(request: Request, response: Response):
@@ -19,12 +22,13 @@ async def get_csrf_token(request: Request, response: Response):
     """
     # Check if token already exists in cookie
     csrf_token = request.cookies.get("csrf_token")
-    
+
     # Generate new token if not present
     if not csrf_token:
-        csrf_token = secrets.token_urlsafe(32)
-        logger.info(f"Generated new CSRF token for client {request.client.host}")
-    
+        csrf_token = secrets.token_hex(32)
+        client_host = request.client.host if request.client else "unknown"
+        logger.info(f"Generated new CSRF token for client {client_host}")
+
     # Always set cookie to refresh expiry
     response.set_cookie(
         key="csrf_token",
@@ -32,9 +36,9 @@ async def get_csrf_token(request: Request, response: Response):
         httponly=True,
         secure=False,  # Set to True in production with HTTPS
         samesite="lax",
-        max_age=3600  # 1 hour
+        max_age=CSRF_TOKEN_MAX_AGE
     )
-    
+
     # Return token in response body for frontend to use in X-CSRF-Token header
     return {
         "csrf_token": csrf_token
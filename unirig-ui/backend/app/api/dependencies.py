@@ -0,0 +1,37 @@
+"""
+Shared FastAPI dependencies.
+Provides request-scoped service instances bound to the request's database session.
+"""
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.services.job_service import JobService
+from app.services.session_service import SessionService
+
+
+def get_job_service(db: Session = Depends(get_db)) -> JobService:
+    """
+    Provide a JobService bound to the request's database session.
+
+    Args:
+        db: Database session (injected)
+
+    Returns:
+        JobService instance
+    """
+    return JobService(db)
+
+
+def get_session_service(db: Session = Depends(get_db)) -> SessionService:
+    """
+    Provide a SessionService bound to the request's database session.
+
+    Args:
+        db: Database session (injected)
+
+    Returns:
+        SessionService instance
+    """
+    return SessionService(db)
@@ -4,7 +4,7 @@ Provides API health status and system information.
 """
 
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.config import settings
 
@@ -14,6 +14,7 @@ router = APIRouter()
 
 class HealthResponse(BaseModel):
     """Health check response model."""
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
     status: str
     version: str
     gpu_available: bool
@@ -3,33 +3,43 @@ Job management endpoints.
 Handles job status queries, processing triggers, and job lifecycle operations.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
-from app.db.database import get_db
+from app.api.dependencies import get_job_service
 from app.services.job_service import JobService
 from app.services.file_service import FileService
 from app.models.job import Job, JobStatus
 from app.utils.errors import JobNotFoundError
+from app.tasks.skeleton_task import generate_skeleton
+from app.tasks.skinning_task import generate_skinning
 
 
 router = APIRouter()
 
+# Jobs move skeleton -> skinning -> merge under the same ID, so even a
+# "completed" job can be re-queued; keep browser caching to polling scale.
+JOB_CACHE_CONTROL = "private, max-age=1"
+
+DEFAULT_SKELETON_SEED = 42
+
 
 class SkeletonRequest(BaseModel):
     """Request model for skeleton generation."""
-    seed: Optional[int] = 42
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
+    seed: Optional[int] = DEFAULT_SKELETON_SEED
 
 
 class SkinningRequest(BaseModel):
     """Request model for skinning generation."""
-    pass
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
 
 
 class TaskResponse(BaseModel):
     """Response model for background task trigger."""
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
     task_id: str
     status: str
     message: str
@@ -37,20 +47,27 @@ class TaskResponse(BaseModel):
 
 class JobListResponse(BaseModel):
     """Response model for job list."""
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
     jobs: List[Job]
     total: int
 
 
 class DeleteResponse(BaseModel):
     """Response model for job deletion."""
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
     message: str
     job_id: str
 
 
+# Serializes job lists in a single pydantic-core pass
+_JOB_LIST_ADAPTER = TypeAdapter(List[Job])
+
+
 @router.get("/jobs/{job_id}", response_model=Job)
-async def get_job(
+def get_job(
     job_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    job_service: JobService = Depends(get_job_service)
 ):
     """
     Get job status and details by ID.
@@ -58,7 +75,8 @@ async def get_job(
     
     Args:
         job_id: Job identifier
-        db: Database session (injected)
+        response: Outgoing response (for Cache-Control)
+        job_service: Job service (injected)
         
     Returns:
         Job: Complete job information with status and results
@@ -79,20 +97,20 @@ async def get_job(
         }
     """
     try:
-        job_service = JobService(db)
-        job = job_service.get_job(job_id)
+        job = job_service.get_job_cached(job_id)
+        response.headers["Cache-Control"] = JOB_CACHE_CONTROL
         return job
     except JobNotFoundError as e:
         raise HTTPException(status_code=404, detail=e.to_dict())
 
 
 @router.get("/sessions/{session_id}/jobs", response_model=JobListResponse)
-async def list_session_jobs(
+def list_session_jobs(
     session_id: str,
     status: Optional[str] = Query(None, description="Filter by job status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs"),
     offset: int = Query(0, ge=0, description="Number of jobs to skip"),
-    db: Session = Depends(get_db)
+    job_service: JobService = Depends(get_job_service)
 ):
     """
     List all jobs for a session with optional filtering.
@@ -102,7 +120,7 @@ async def list_session_jobs(
         status: Optional status filter (uploaded/queued/processing/completed/failed)
         limit: Maximum jobs to return (1-1000)
         offset: Pagination offset
-        db: Database session (injected)
+        job_service: Job service (injected)
         
     Returns:
         JobListResponse: List of jobs with total count
@@ -116,8 +134,6 @@ async def list_session_jobs(
             "total": 3
         }
     """
-    job_service = JobService(db)
-    
     # Convert status string to enum if provided
     status_filter = None
     if status:
@@ -136,14 +152,17 @@ async def list_session_jobs(
         offset=offset
     )
     
-    return JobListResponse(jobs=jobs, total=len(jobs))
+    # Jobs are already validated models; serialize straight to orjson
+    # instead of re-validating up to 1000 jobs through JobListResponse
+    payload = _JOB_LIST_ADAPTER.dump_python(jobs, mode="json")
+    return ORJSONResponse({"jobs": payload, "total": len(payload)})
 
 
 @router.post("/jobs/{job_id}/skeleton", response_model=TaskResponse)
-async def trigger_skeleton_generation(
+def trigger_skeleton_generation(
     job_id: str,
-    request: SkeletonRequest = SkeletonRequest(),
-    db: Session = Depends(get_db)
+    request: Optional[SkeletonRequest] = None,
+    job_service: JobService = Depends(get_job_service)
 ):
     """
     Trigger skeleton generation for a job.
@@ -151,8 +170,8 @@ async def trigger_skeleton_generation(
     
     Args:
         job_id: Job identifier
-        request: Skeleton generation parameters (seed)
-        db: Database session (injected)
+        request: Skeleton generation parameters (seed); optional body
+        job_service: Job service (injected)
         
     Returns:
         TaskResponse: Task ID and status
@@ -172,39 +191,28 @@ async def trigger_skeleton_generation(
         }
     """
     try:
-        job_service = JobService(db)
-        job = job_service.get_job(job_id)
+        # Queue the job unless the session already has one active
+        # (max 1 processing job per session), in a single statement
+        job, active_count = job_service.claim_for_trigger(job_id)
         
-        # Check for concurrent job limit (max 1 processing job per session)
-        session_id = job.session_id
-        active_jobs = job_service.get_active_jobs_for_session(session_id)
-        
-        if len(active_jobs) > 0:
+        if active_count > 0:
             raise HTTPException(
                 status_code=429,
                 detail={
                     "error": {
                         "code": "CONCURRENT_JOB_LIMIT",
                         "message": "A job is already processing for this session",
-                        "details": f"Found {len(active_jobs)} active job(s)",
+                        "details": f"Found {active_count} active job(s)",
                         "suggestion": "Wait for the current job to complete before starting a new one"
                     }
                 }
             )
         
-        # Update job status to queued
-        job_service.update_job(
-            job_id=job_id,
-            status=JobStatus.QUEUED,
-            progress=0.0
-        )
-        
         # Trigger Celery task for skeleton generation
-        from app.tasks.skeleton_task import generate_skeleton
         task = generate_skeleton.delay(
             job_id=job_id,
             input_file=job.file_path,
-            seed=request.seed
+            seed=request.seed if request is not None else DEFAULT_SKELETON_SEED
         )
         
         return TaskResponse(
@@ -218,10 +226,10 @@ async def trigger_skeleton_generation(
 
 
 @router.post("/jobs/{job_id}/skinning", response_model=TaskResponse)
-async def trigger_skinning_generation(
+def trigger_skinning_generation(
     job_id: str,
-    request: SkinningRequest = SkinningRequest(),
-    db: Session = Depends(get_db)
+    request: Optional[SkinningRequest] = None,
+    job_service: JobService = Depends(get_job_service)
 ):
     """
     Trigger skinning weight generation for a job.
@@ -230,8 +238,8 @@ async def trigger_skinning_generation(
     
     Args:
         job_id: Job identifier
-        request: Skinning generation parameters
-        db: Database session (injected)
+        request: Skinning generation parameters; optional body
+        job_service: Job service (injected)
         
     Returns:
         TaskResponse: Task ID and status
@@ -250,8 +258,9 @@ async def trigger_skinning_generation(
         }
     """
     try:
-        job_service = JobService(db)
-        job = job_service.get_job(job_id)
+        # Queue the job if it has a skeleton and the session has no active
+        # job (max 1 processing job per session), in a single statement
+        job, active_count = job_service.claim_for_trigger(job_id, require_skeleton=True)
         
         # Validate skeleton exists
         if not job.results.skeleton_file:
@@ -260,32 +269,20 @@ async def trigger_skinning_generation(
                 detail="Skeleton must be generated before skinning. Call /skeleton endpoint first."
             )
         
-        # Check for concurrent job limit (max 1 processing job per session)
-        session_id = job.session_id
-        active_jobs = job_service.get_active_jobs_for_session(session_id)
-        
-        if len(active_jobs) > 0:
+        if active_count > 0:
             raise HTTPException(
                 status_code=429,
                 detail={
                     "error": {
                         "code": "CONCURRENT_JOB_LIMIT",
                         "message": "A job is already processing for this session",
-                        "details": f"Found {len(active_jobs)} active job(s)",
+                        "details": f"Found {active_count} active job(s)",
                         "suggestion": "Wait for the current job to complete before starting a new one"
                     }
                 }
             )
         
-        # Update job status to queued
-        job_service.update_job(
-            job_id=job_id,
-            status=JobStatus.QUEUED,
-            progress=0.0
-        )
-        
         # Trigger Celery task for skinning generation
-        from app.tasks.skinning_task import generate_skinning
         task = generate_skinning.delay(
             job_id=job_id,
             skeleton_file=job.results.skeleton_file
@@ -302,16 +299,16 @@ async def trigger_skinning_generation(
 
 
 @router.delete("/jobs/{job_id}", response_model=DeleteResponse)
-async def delete_job(
+def delete_job(
     job_id: str,
-    db: Session = Depends(get_db)
+    job_service: JobService = Depends(get_job_service)
 ):
     """
     Delete a job and its associated files.
     
     Args:
         job_id: Job identifier
-        db: Database session (injected)
+        job_service: Job service (injected)
         
     Returns:
         DeleteResponse: Confirmation message
@@ -329,8 +326,6 @@ async def delete_job(
         }
     """
     try:
-        job_service = JobService(db)
-        
         # Get job to retrieve file paths
         job = job_service.get_job(job_id)
         
@@ -2,22 +2,21 @@
 Session management API endpoints
 """
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 import logging
-import os
 
 from app.db.database import get_db
 from app.db.models import Session
-from app.services.cleanup_service import CleanupService
 from app.services.disk_monitor import DiskMonitor
-from app.tasks.cleanup import cleanup_single_session
+from app.tasks.cleanup import cleanup_expired_sessions, cleanup_single_session
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 class SessionStats(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
     session_id: str
     created_at: str
     last_accessed: str
@@ -28,6 +27,7 @@ class SessionStats(BaseModel):
 
 
 class DiskSpaceInfo(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True, from_attributes=True)
     total_gb: float
     used_gb: float
     free_gb: float
@@ -36,7 +36,7 @@ class DiskSpaceInfo(BaseModel):
 
 
 @router.get('/sessions/{session_id}/stats', response_model=SessionStats)
-async def get_session_stats(session_id: str, db = Depends(get_db)):
+def get_session_stats(session_id: str, db = Depends(get_db)):
     """
     Get statistics for a specific session
     
@@ -52,32 +52,21 @@ async def get_session_stats(session_id: str, db = Depends(get_db)):
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Calculate directory sizes
-        uploads_size = 0
-        results_size = 0
-        upload_count = 0
-        
+        # Calculate directory sizes (single scandir pass per directory)
         uploads_dir = f"uploads/{session_id}"
         results_dir = f"results/{session_id}"
         
-        if os.path.exists(uploads_dir):
-            uploads_size = DiskMonitor.get_directory_size(uploads_dir)
-            # Count files in uploads
-            import os
-            for root, dirs, files in os.walk(uploads_dir):
-                upload_count += len(files)
-        
-        if os.path.exists(results_dir):
-            results_size = DiskMonitor.get_directory_size(results_dir)
+        uploads_size, upload_count = DiskMonitor.get_directory_size_and_count(uploads_dir)
+        results_size, _ = DiskMonitor.get_directory_size_and_count(results_dir)
         
         return SessionStats(
             session_id=session.session_id,
             created_at=session.created_at.isoformat(),
             last_accessed=session.last_accessed.isoformat(),
             upload_count=upload_count,
-            uploads_size_mb=uploads_size * 1024,  # Convert GB to MB
-            results_size_mb=results_size * 1024,
-            total_size_mb=(uploads_size + results_size) * 1024
+            uploads_size_mb=uploads_size / (1024 ** 2),  # Convert bytes to MB
+            results_size_mb=results_size / (1024 ** 2),
+            total_size_mb=(uploads_size + results_size) / (1024 ** 2)
         )
         
     except HTTPException:
@@ -88,7 +77,7 @@ async def get_session_stats(session_id: str, db = Depends(get_db)):
 
 
 @router.delete('/sessions/{session_id}')
-async def delete_session(session_id: str, db = Depends(get_db)):
+def delete_session(session_id: str, db = Depends(get_db)):
     """
     Delete a session and all associated files
     User-triggered cleanup action
@@ -125,7 +114,7 @@ async def delete_session(session_id: str, db = Depends(get_db)):
 
 
 @router.get('/disk-space', response_model=DiskSpaceInfo)
-async def get_disk_space():
+def get_disk_space():
     """
     Get current disk space information
     
@@ -133,12 +122,12 @@ async def get_disk_space():
         DiskSpaceInfo with usage statistics
     """
     try:
-        usage = DiskMonitor.get_disk_usage()
+        usage = DiskMonitor.get_cached_disk_usage()
         
         warning = None
-        if DiskMonitor.is_low_disk_space():
+        if DiskMonitor.is_low_disk_space(usage=usage):
             warning = f"CRITICAL: Only {usage['free_gb']:.1f}GB free. Emergency cleanup may trigger."
-        elif DiskMonitor.needs_warning():
+        elif DiskMonitor.needs_warning(usage=usage):
             warning = f"Warning: Only {usage['free_gb']:.1f}GB free."
         
         return DiskSpaceInfo(
@@ -155,22 +144,23 @@ async def get_disk_space():
 
 
 @router.post('/sessions/cleanup-all')
-async def cleanup_all_sessions(db = Depends(get_db)):
+def cleanup_all_sessions():
     """
-    Clean up all expired sessions immediately
-    Admin/maintenance action
+    Clean up all expired sessions
+    Admin/maintenance action; runs as a Celery task so the request does not
+    wait for secure file deletion
     
     Returns:
-        Cleanup results
+        Success message and task ID
     """
     try:
         logger.info("Manual cleanup of all expired sessions initiated")
-        results = CleanupService.cleanup_expired_sessions()
+        task = cleanup_expired_sessions.delay()
         
         return {
             "success": True,
-            "message": "Cleanup completed",
-            "results": results
+            "message": "Cleanup initiated",
+            "task_id": task.id
         }
         
     except Exception as e:
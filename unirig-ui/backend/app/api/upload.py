@@ -5,11 +5,10 @@ Handles 3D model uploads with validation and session management.
 
 import uuid
 import logging
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form, Depends, HTTPException
 from typing import Optional
 
-from app.db.database import get_db
+from app.api.dependencies import get_job_service, get_session_service
 from app.services.file_service import FileService
 from app.services.job_service import JobService
 from app.services.session_service import SessionService
@@ -24,9 +23,11 @@ router = APIRouter()
 
 @router.post("/upload", response_model=Job)
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session_id: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    job_service: JobService = Depends(get_job_service),
+    session_service: SessionService = Depends(get_session_service)
 ):
     """
     Upload a 3D model file for rigging.
@@ -35,9 +36,11 @@ async def upload_file(
     Creates a job entry and stores the file in a session-specific directory.
     
     Args:
+        background_tasks: Post-response task runner (injected)
         file: Uploaded 3D model file
         session_id: Optional session ID (generated if not provided)
-        db: Database session (injected)
+        job_service: Job service (injected)
+        session_service: Session service (injected)
         
     Returns:
         Job: Created job with upload details
@@ -63,25 +66,17 @@ async def upload_file(
         # Validate file format
         FileService.validate_file(file)
         
-        # Create or retrieve session
-        session_service = SessionService(db)
         if not session_id:
             session_id = str(uuid.uuid4())
         
-        # Create session if it doesn't exist
-        try:
-            session_service.get_session(session_id)
-            # Update last accessed time
-            session_service.update_last_accessed(session_id)
-        except:
-            # Create new session
-            session_service.create_session(session_id)
-        
         # Save uploaded file
-        file_path, original_filename, file_size = await FileService.save_upload(file, session_id)
+        file_path, original_filename, file_size, content_hash = await FileService.save_upload(file, session_id)
+        logger.info(f"Saved upload {original_filename} ({file_size} bytes, sha256={content_hash})")
+        
+        # Create or touch the session; committed together with the job below
+        session_service.upsert_and_touch(session_id)
         
         # Create job entry
-        job_service = JobService(db)
         job = job_service.create_job(
             session_id=session_id,
             filename=original_filename,
@@ -89,9 +84,10 @@ async def upload_file(
             file_path=file_path
         )
         
-        # Trigger skeleton generation task
+        # Trigger skeleton generation task once the response has been sent,
+        # keeping broker latency out of the upload request
         logger.info(f"Triggering skeleton generation for job {job.job_id}")
-        generate_skeleton.delay(job_id=job.job_id, input_file=file_path)
+        background_tasks.add_task(generate_skeleton.delay, job_id=job.job_id, input_file=file_path)
         
         return job
         
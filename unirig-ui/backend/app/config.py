@@ -3,12 +3,27 @@ Configuration loader for UniRig UI backend.
 Loads settings from config.yaml and provides them as Pydantic models.
 """
 
+import hashlib
+import json
+import os
+import pickle
+import struct
+import tempfile
 import yaml
+from functools import lru_cache
 from pathlib import Path
+import pydantic
 from pydantic import BaseModel
 from typing import Optional
 
 
+# libyaml-backed loader when PyYAML was built with it; pure-Python otherwise
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parsed-config cache header: (schema hash, source mtime_ns, source size)
+_CACHE_HEADER = struct.Struct("<8sQQ")
+
+
 class SystemConfig(BaseModel):
     """System-level configuration."""
     python_version: str
@@ -46,9 +61,70 @@ class Config(BaseModel):
     celery: CeleryConfig
 
 
+@lru_cache(maxsize=None)
+def _cache_version() -> bytes:
+    """
+    Identify the shape of the Config models for the parsed-config cache.
+    
+    Pickles skip validation, so a cache written for other models (or another
+    pydantic release) must never be loaded. Hashing the JSON schema makes
+    any change to the Config classes invalidate the cache automatically.
+    
+    Returns:
+        First 8 bytes of a SHA-256 over pydantic's version and the schema
+    """
+    schema = json.dumps(Config.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(f"{pydantic.VERSION}\n{schema}".encode()).digest()[:8]
+
+
+def _load_cached_config(cache_file: Path, header: bytes) -> Optional[Config]:
+    """
+    Load a pickled Config if the cache was written for the current file.
+    
+    Args:
+        cache_file: Path to the pickle cache
+        header: Expected header for the current config.yaml
+    
+    Returns:
+        Cached Config, or None if missing, stale, or unreadable
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            if f.read(_CACHE_HEADER.size) != header:
+                return None
+            config = pickle.load(f)
+        return config if isinstance(config, Config) else None
+    except Exception:
+        return None
+
+
+def _write_cached_config(cache_file: Path, header: bytes, config: Config) -> None:
+    """
+    Atomically write a pickled Config next to config.yaml.
+    Failures (e.g. read-only mounts) are ignored; the cache is optional.
+    
+    Args:
+        cache_file: Path to the pickle cache
+        header: Header identifying the config.yaml it was parsed from
+        config: Parsed configuration
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.name)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            pickle.dump(config, f, protocol=5)
+        os.replace(tmp_path, cache_file)
+    except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def load_config(config_path: str = "config.yaml") -> Config:
     """
     Load configuration from YAML file.
+    A pickled copy is kept in config.yaml.pkl and reused while config.yaml's
+    mtime and size are unchanged.
     
     Args:
         config_path: Path to config.yaml file (relative to project root)
@@ -68,11 +144,21 @@ def load_config(config_path: str = "config.yaml") -> Config:
             "Please run install.sh to generate config.yaml"
         )
     
+    # Reuse the parsed config from a previous start if config.yaml is unchanged
+    stat = config_file.stat()
+    header = _CACHE_HEADER.pack(_cache_version(), stat.st_mtime_ns, stat.st_size)
+    cache_file = config_file.with_suffix('.yaml.pkl')
+    cached = _load_cached_config(cache_file, header)
+    if cached is not None:
+        return cached
+    
     try:
-        with open(config_file, 'r') as f:
-            config_data = yaml.safe_load(f)
+        with open(config_file, 'rb') as f:
+            config_data = yaml.load(f, Loader=_YamlLoader)
         
-        return Config(**config_data)
+        config = Config(**config_data)
+        _write_cached_config(cache_file, header, config)
+        return config
     
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML in config file: {e}")
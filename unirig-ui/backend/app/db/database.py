@@ -3,40 +3,94 @@ Database connection and initialization for SQLite.
 Provides SQLAlchemy engine, session factory, and database initialization.
 """
 
+import logging
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 # SQLite database file location (use env var if available, otherwise default)
 DATABASE_PATH = os.getenv("DATABASE_PATH", "./unirig_ui.db")
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 # Create SQLAlchemy engine
+# Connections are pooled and handed across FastAPI threadpool workers
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Needed for SQLite with FastAPI
+    connect_args={
+        "check_same_thread": False,  # Needed for SQLite with FastAPI
+        "timeout": 30  # Wait for writer locks instead of failing fast
+    },
+    poolclass=QueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_recycle=3600,
     echo=False  # Set to True for SQL query logging during development
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection for concurrent API/worker access.
+    WAL lets readers proceed during writes; NORMAL sync is durable under WAL.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB memory-mapped I/O
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Instances stay loaded after commit; column defaults are filled in Python, so
+# the committed state already matches the row and reloading it is wasted work
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for SQLAlchemy models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
+
+# Indexes superseded by newer definitions in app.db.models
+RETIRED_INDEXES = ("idx_jobs_session_status",)
 
 
 def init_db():
     """
     Initialize the database.
-    Creates all tables defined in SQLAlchemy models if they don't exist.
+    Creates all tables and indexes defined in SQLAlchemy models if they don't exist.
     Should be called on application startup.
     """
     from app.db import models  # Import models to register them with Base
     
     Base.metadata.create_all(bind=engine)
-    print("✅ Database initialized successfully")
+    
+    # create_all skips existing tables, so add indexes introduced since the
+    # database was created and drop ones they replace
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        for index_name in RETIRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        
+        # Convert job status/stage rows written as strings to integer codes
+        for column, enum_cls, codes in (
+            ("status", models.JobStatus, models.JobStatusCode),
+            ("stage", models.JobStage, models.JobStageCode),
+        ):
+            for member in enum_cls:
+                conn.execute(
+                    text(f"UPDATE jobs SET {column} = :code WHERE {column} = :value"),
+                    {"code": int(codes[member.name]), "value": member.value}
+                )
+    logger.info("Database initialized successfully")
 
 
 def get_db() -> Session:
@@ -3,10 +3,36 @@ SQLAlchemy database models for UniRig UI.
 Defines Session and Job tables with relationships and indexes.
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Index
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import List, Optional
+from sqlalchemy import String, Integer, Float, Boolean, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
+from app.db.types import CodedEnum, UTCDateTime
+from app.models.job import JobStatus, JobStage
+
+
+def _utcnow() -> datetime:
+    """Current time as an aware UTC datetime (column default)."""
+    return datetime.now(timezone.utc)
+
+
+class JobStatusCode(IntEnum):
+    """On-disk codes for JobStatus. Never renumber existing members."""
+    UPLOADED = 0
+    QUEUED = 1
+    PROCESSING = 2
+    COMPLETED = 3
+    FAILED = 4
+
+
+class JobStageCode(IntEnum):
+    """On-disk codes for JobStage. Never renumber existing members."""
+    UPLOAD = 0
+    SKELETON = 1
+    SKINNING = 2
+    MERGE = 3
 
 
 class Session(Base):
@@ -17,17 +43,18 @@ class Session(Base):
     """
     __tablename__ = "sessions"
     
-    session_id = Column(String, primary_key=True, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    last_accessed = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    expired = Column(Boolean, default=False, index=True)
+    session_id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime(), default=_utcnow, nullable=False)
+    last_accessed: Mapped[datetime] = mapped_column(UTCDateTime(), default=_utcnow, onupdate=_utcnow, nullable=False)
+    expired: Mapped[Optional[bool]] = mapped_column(Boolean, default=False, index=True)
     
     # Relationship to jobs
-    jobs = relationship("Job", back_populates="session", cascade="all, delete-orphan")
+    jobs: Mapped[List["Job"]] = relationship("Job", back_populates="session", cascade="all, delete-orphan")
     
     # Index for efficient cleanup queries
     __table_args__ = (
         Index('idx_sessions_expired_accessed', 'expired', 'last_accessed'),
+        Index('idx_sessions_last_accessed', 'last_accessed'),
     )
     
     def __repr__(self):
@@ -43,44 +70,47 @@ class Job(Base):
     __tablename__ = "jobs"
     
     # Primary key and foreign keys
-    job_id = Column(String, primary_key=True, index=True)
-    session_id = Column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), nullable=False, index=True)
+    job_id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
+    session_id: Mapped[str] = mapped_column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), nullable=False, index=True)
     
     # File information
-    filename = Column(String, nullable=False)
-    file_size = Column(Integer, nullable=False)
-    file_path = Column(String, nullable=False)
+    filename: Mapped[str] = mapped_column(String, nullable=False)
+    file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    file_path: Mapped[str] = mapped_column(String, nullable=False)
     
     # Job status and progress
-    status = Column(
-        String,
+    status: Mapped[str] = mapped_column(
+        CodedEnum(JobStatus, JobStatusCode),
         nullable=False,
-        default="uploaded",
+        default=JobStatus.UPLOADED.value,
         index=True
     )
     # Status values: 'uploaded', 'queued', 'processing', 'completed', 'failed'
+    # (stored as JobStatusCode integers)
     
-    progress = Column(Float, default=0.0)  # 0.0 to 1.0
-    stage = Column(String, nullable=True)  # 'upload', 'skeleton_generation', 'skinning_generation', 'merge'
+    progress: Mapped[Optional[float]] = mapped_column(Float, default=0.0)  # 0.0 to 1.0
+    stage: Mapped[Optional[str]] = mapped_column(CodedEnum(JobStage, JobStageCode), nullable=True)  # 'upload', 'skeleton_generation', 'skinning_generation', 'merge'
     
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Timestamps (filled in Python so INSERTs need no read-back)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime(), default=_utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(UTCDateTime(), default=_utcnow, onupdate=_utcnow, nullable=False)
     
     # Error tracking
-    error_message = Column(String, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     # Result file paths
-    skeleton_file = Column(String, nullable=True)
-    skin_file = Column(String, nullable=True)
-    final_file = Column(String, nullable=True)
+    skeleton_file: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    skin_file: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    final_file: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     # Relationship to session
-    session = relationship("Session", back_populates="jobs")
+    session: Mapped["Session"] = relationship("Session", back_populates="jobs")
     
-    # Indexes for efficient queries
+    # Indexes for efficient queries; trailing created_at lets SQLite serve
+    # "newest jobs first" listings straight from the index without a sort
     __table_args__ = (
-        Index('idx_jobs_session_status', 'session_id', 'status'),
+        Index('idx_jobs_session_status_created', 'session_id', 'status', 'created_at'),
+        Index('idx_jobs_session_created', 'session_id', 'created_at'),
     )
     
     def __repr__(self):
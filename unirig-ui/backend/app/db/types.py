@@ -0,0 +1,79 @@
+"""
+Custom SQLAlchemy column types for UniRig UI.
+Stores string enums as compact integer codes and timestamps as UTC.
+"""
+
+from datetime import datetime, timezone
+from enum import Enum, IntEnum
+from typing import Optional, Type, Union
+
+from sqlalchemy import DateTime, SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class CodedEnum(TypeDecorator):
+    """
+    Persist a string Enum as a SmallInteger code.
+
+    Python code keeps reading and writing the enum's string values; only the
+    stored representation changes. Codes are matched to enum members by name,
+    so the IntEnum fixes the on-disk value of each member independently of
+    declaration order.
+
+    Rows written before the switch to integer codes may still hold the
+    string value; those are passed through unchanged when read.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls: Type[Enum], codes: Type[IntEnum]):
+        """
+        Initialize the column type.
+
+        Args:
+            enum_cls: String enum exposed to Python code (e.g. JobStatus)
+            codes: IntEnum with a member of the same name for each enum value
+        """
+        super().__init__()
+        self.enum_cls = enum_cls
+        self.codes = codes
+
+    def process_bind_param(self, value: Optional[Union[str, Enum, int]], dialect) -> Optional[int]:
+        if value is None or isinstance(value, int):
+            return value
+        return int(self.codes[self.enum_cls(value).name])
+
+    def process_result_value(self, value: Optional[Union[int, str]], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            if not value.isdigit():
+                return value  # Legacy string row
+            value = int(value)
+        return self.enum_cls[self.codes(value).name].value
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware UTC timestamp column.
+
+    SQLite has no timezone-aware storage, so values are written as naive UTC
+    in the same format as plain DateTime columns, and tagged with UTC again
+    when read. Python code therefore only ever sees aware datetimes, and
+    existing rows need no migration.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(timezone=True)
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
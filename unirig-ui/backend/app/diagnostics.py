@@ -5,12 +5,18 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime
+import asyncio
 import os
 import logging
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Diagnostics log directory; created on first report
+DIAGNOSTICS_LOG_DIR = os.environ.get('DIAGNOSTICS_LOG_DIR', '/tmp/unirig-diagnostics')
+_log_dir_created = False
+
 
 class ErrorDetails(BaseModel):
     code: str
@@ -40,6 +46,21 @@ class DiagnosticReport(BaseModel):
     systemInfo: SystemInfo
 
 
+def _write_report(log_file: str, payload: str) -> None:
+    """
+    Write a diagnostics report to disk (blocking; run in a worker thread).
+    
+    Args:
+        log_file: Destination path inside DIAGNOSTICS_LOG_DIR
+        payload: Fully formatted report text
+    """
+    global _log_dir_created
+    if not _log_dir_created:
+        os.makedirs(DIAGNOSTICS_LOG_DIR, exist_ok=True)
+        _log_dir_created = True
+    Path(log_file).write_text(payload)
+
+
 @router.post('/diagnostics')
 async def report_diagnostics(report: DiagnosticReport):
     """
@@ -57,42 +78,45 @@ async def report_diagnostics(report: DiagnosticReport):
         logger.error(f"Recent Actions: {report.recentActions}")
         
         # Save to diagnostics log file if configured
-        log_dir = os.environ.get('DIAGNOSTICS_LOG_DIR', '/tmp/unirig-diagnostics')
-        os.makedirs(log_dir, exist_ok=True)
-        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         session_id = report.sessionId or 'unknown'
-        log_file = os.path.join(log_dir, f'error_{timestamp}_{session_id}.txt')
+        log_file = os.path.join(DIAGNOSTICS_LOG_DIR, f'error_{timestamp}_{session_id}.txt')
         
-        with open(log_file, 'w') as f:
-            f.write('UniRig Error Report\n')
-            f.write('=' * 80 + '\n\n')
-            f.write(f"Timestamp: {report.timestamp}\n")
-            f.write(f"Session ID: {session_id}\n\n")
+        if report.recentActions:
+            recent_actions = ''.join(
+                f"{i}. {action}\n" for i, action in enumerate(report.recentActions, 1)
+            )
+        else:
+            recent_actions = 'None recorded\n'
+        
+        parts = [
+            'UniRig Error Report\n',
+            '=' * 80 + '\n\n',
+            f"Timestamp: {report.timestamp}\n",
+            f"Session ID: {session_id}\n\n",
             
-            f.write('Error Details:\n')
-            f.write('-' * 80 + '\n')
-            f.write(f"Code: {report.errorDetails.code}\n")
-            f.write(f"Message: {report.errorDetails.message}\n")
-            if report.errorDetails.stack:
-                f.write(f"\nStack Trace:\n{report.errorDetails.stack}\n")
+            'Error Details:\n',
+            '-' * 80 + '\n',
+            f"Code: {report.errorDetails.code}\n",
+            f"Message: {report.errorDetails.message}\n",
+            f"\nStack Trace:\n{report.errorDetails.stack}\n" if report.errorDetails.stack else '',
             
-            f.write('\nSystem Information:\n')
-            f.write('-' * 80 + '\n')
-            f.write(f"User Agent: {report.userAgent}\n")
-            f.write(f"Platform: {report.systemInfo.platform}\n")
-            f.write(f"Language: {report.systemInfo.language}\n")
-            f.write(f"Cookies Enabled: {report.systemInfo.cookiesEnabled}\n")
-            f.write(f"Online: {report.systemInfo.onLine}\n")
-            f.write(f"Viewport: {report.viewport.width}x{report.viewport.height}\n")
+            '\nSystem Information:\n',
+            '-' * 80 + '\n',
+            f"User Agent: {report.userAgent}\n",
+            f"Platform: {report.systemInfo.platform}\n",
+            f"Language: {report.systemInfo.language}\n",
+            f"Cookies Enabled: {report.systemInfo.cookiesEnabled}\n",
+            f"Online: {report.systemInfo.onLine}\n",
+            f"Viewport: {report.viewport.width}x{report.viewport.height}\n",
             
-            f.write('\nRecent Actions:\n')
-            f.write('-' * 80 + '\n')
-            if report.recentActions:
-                for i, action in enumerate(report.recentActions, 1):
-                    f.write(f"{i}. {action}\n")
-            else:
-                f.write('None recorded\n')
+            '\nRecent Actions:\n',
+            '-' * 80 + '\n',
+            recent_actions,
+        ]
+        
+        # Single write of the assembled report, off the event loop
+        await asyncio.to_thread(_write_report, log_file, ''.join(parts))
         
         logger.info(f'Diagnostics saved to: {log_file}')
         
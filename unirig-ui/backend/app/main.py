@@ -3,7 +3,11 @@ FastAPI application entry point.
 Initializes the API server with middleware, routers, and database.
 """
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import health, upload, jobs, download, sessions, csrf
@@ -11,7 +15,21 @@ from app import diagnostics
 from app.db.database import init_db
 from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.middleware.csrf import CSRFMiddleware
-from app.middleware.rate_limiter import rate_limit_middleware
+from app.middleware.upload_limit import UploadLimitMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: initialize the database on startup
+    (creating tables if they don't exist) and log shutdown.
+    """
+    init_db()
+    logger.info("FastAPI application started successfully")
+    yield
+    logger.info("FastAPI application shutting down")
 
 
 # Create FastAPI application
@@ -20,13 +38,15 @@ app = FastAPI(
     description="REST API for UniRig automatic 3D model rigging",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add security middleware (order matters - added in reverse order of execution)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(CSRFMiddleware)
-app.middleware("http")(rate_limit_middleware)
+app.add_middleware(UploadLimitMiddleware)
 
 # CORS configuration for frontend (React on localhost:3000)
 # Note: CORS should be after security middleware
@@ -43,26 +63,6 @@ app.add_middleware(
 )
 
 
-# Startup event: Initialize database
-@app.on_event("startup")
-async def startup_event():
-    """
-    Initialize the database on application startup.
-    Creates tables if they don't exist.
-    """
-    init_db()
-    print("✅ FastAPI application started successfully")
-
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Cleanup on application shutdown.
-    """
-    print("🛑 FastAPI application shutting down")
-
-
 # Include API routers with /api prefix
 app.include_router(health.router, prefix="/api", tags=["Health"])
 app.include_router(csrf.router, prefix="/api", tags=["CSRF"])
@@ -0,0 +1,24 @@
+"""
+Cookie helpers for plain ASGI middleware
+Reads cookies straight from raw headers without building a Request
+"""
+from typing import Optional
+
+
+def get_cookie(cookie_header: bytes, name: bytes) -> Optional[bytes]:
+    """
+    Extract a single cookie value from a raw Cookie header
+    
+    Args:
+        cookie_header: Raw Cookie header value
+        name: Cookie name to look up
+        
+    Returns:
+        Cookie value, or None if the cookie is not present
+    """
+    prefix = name + b"="
+    for part in cookie_header.split(b";"):
+        part = part.strip()
+        if part.startswith(prefix):
+            return part[len(prefix):]
+    return None
@@ -2,40 +2,50 @@
 CSRF protection middleware for FastAPI
 Implements CSRF token generation and validation
 """
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import secrets
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+import hmac
 import logging
 
+from app.middleware.cookies import get_cookie
+
 logger = logging.getLogger(__name__)
 
 
-class CSRFMiddleware(BaseHTTPMiddleware):
+class CSRFMiddleware:
     """
     CSRF protection middleware
-    Generates and validates CSRF tokens for state-changing requests
+    Validates CSRF tokens for state-changing requests
+    Implemented as plain ASGI; safe methods pass straight through
     """
     
+    safe_methods = frozenset({"GET", "HEAD", "OPTIONS"})
+    
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.safe_methods = {"GET", "HEAD", "OPTIONS"}
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next):
-        # Skip CSRF check for safe methods (GET, HEAD, OPTIONS)
-        if request.method in self.safe_methods:
-            response = await call_next(request)
-            return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip CSRF check for non-HTTP traffic and safe methods (GET, HEAD, OPTIONS)
+        if scope["type"] != "http" or scope["method"] in self.safe_methods:
+            await self.app(scope, receive, send)
+            return
         
         # For state-changing requests (POST, PUT, DELETE), validate CSRF token
-        csrf_cookie = request.cookies.get("csrf_token")
-        csrf_header = request.headers.get("X-CSRF-Token")
+        cookie_header = b""
+        csrf_header = None
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                # HTTP/2 clients may split cookies across several headers
+                cookie_header = cookie_header + b";" + value if cookie_header else value
+            elif name == b"x-csrf-token":
+                csrf_header = value
+        csrf_cookie = get_cookie(cookie_header, b"csrf_token")
         
         if not csrf_cookie or not csrf_header:
-            logger.warning(f"CSRF token missing for {request.method} {request.url.path}")
-            raise HTTPException(
+            logger.warning(f"CSRF token missing for {scope['method']} {scope['path']}")
+            response = JSONResponse(
                 status_code=403,
-                detail={
+                content={
                     "error": {
                         "code": "CSRF_TOKEN_MISSING",
                         "message": "CSRF token required",
@@ -44,12 +54,14 @@ class CSRFMiddleware(BaseHTTPMiddleware):
                     }
                 }
             )
+            await response(scope, receive, send)
+            return
         
-        if csrf_cookie != csrf_header:
-            logger.warning(f"CSRF token mismatch for {request.method} {request.url.path}")
-            raise HTTPException(
+        if not hmac.compare_digest(csrf_cookie, csrf_header):
+            logger.warning(f"CSRF token mismatch for {scope['method']} {scope['path']}")
+            response = JSONResponse(
                 status_code=403,
-                detail={
+                content={
                     "error": {
                         "code": "CSRF_TOKEN_INVALID",
                         "message": "Invalid CSRF token",
@@ -58,7 +70,8 @@ class CSRFMiddleware(BaseHTTPMiddleware):
                     }
                 }
             )
+            await response(scope, receive, send)
+            return
         
         # CSRF check passed, proceed with request
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
@@ -2,28 +2,36 @@
 Rate limiting middleware for FastAPI
 Prevents abuse by limiting requests per session
 """
-from fastapi import Request, HTTPException
-from typing import Dict
-from datetime import datetime, timedelta
+from fastapi import HTTPException
+from collections import OrderedDict, deque
+from typing import Deque
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Sliding window for upload rate limiting
+RATE_LIMIT_WINDOW_SECONDS = 3600.0
+
 
 class RateLimiter:
     """
     Simple in-memory rate limiter for tracking upload requests per session
     """
     
-    def __init__(self, max_uploads_per_hour: int = 10):
+    def __init__(self, max_uploads_per_hour: int = 10, max_sessions: int = 10000):
         """
         Initialize rate limiter
         
         Args:
             max_uploads_per_hour: Maximum number of uploads allowed per session per hour
+            max_sessions: Maximum number of sessions tracked; least recently
+                active sessions are evicted beyond this
         """
         self.max_uploads = max_uploads_per_hour
-        self.upload_history: Dict[str, list] = {}  # session_id -> list of timestamps
+        self.max_sessions = max_sessions
+        # session_id -> monotonic upload timestamps, oldest first (LRU order)
+        self.upload_history: "OrderedDict[str, Deque[float]]" = OrderedDict()
     
     def check_upload_rate(self, session_id: str) -> bool:
         """
@@ -38,21 +46,26 @@ class RateLimiter:
         Raises:
             HTTPException: If rate limit is exceeded
         """
-        now = datetime.utcnow()
-        hour_ago = now - timedelta(hours=1)
+        now = time.monotonic()
+        cutoff = now - RATE_LIMIT_WINDOW_SECONDS
         
         # Get upload history for this session
-        if session_id not in self.upload_history:
-            self.upload_history[session_id] = []
+        try:
+            history = self.upload_history[session_id]
+            self.upload_history.move_to_end(session_id)
+        except KeyError:
+            history = deque(maxlen=self.max_uploads)
+            self.upload_history[session_id] = history
+            # Bound memory by evicting the least recently active sessions
+            while len(self.upload_history) > self.max_sessions:
+                self.upload_history.popitem(last=False)
         
-        # Filter out uploads older than 1 hour
-        self.upload_history[session_id] = [
-            ts for ts in self.upload_history[session_id] 
-            if ts > hour_ago
-        ]
+        # Drop uploads older than 1 hour
+        while history and history[0] < cutoff:
+            history.popleft()
         
         # Check if limit exceeded
-        if len(self.upload_history[session_id]) >= self.max_uploads:
+        if len(history) >= self.max_uploads:
             logger.warning(f"Rate limit exceeded for session {session_id}")
             raise HTTPException(
                 status_code=429,
@@ -67,50 +80,21 @@ class RateLimiter:
             )
         
         # Record this upload
-        self.upload_history[session_id].append(now)
+        history.append(now)
         return True
     
     def cleanup_old_entries(self):
-        """Remove old entries to prevent memory growth"""
-        now = datetime.utcnow()
-        hour_ago = now - timedelta(hours=1)
+        """Remove expired entries (safety net; the LRU cap already bounds memory)"""
+        cutoff = time.monotonic() - RATE_LIMIT_WINDOW_SECONDS
         
-        for session_id in list(self.upload_history.keys()):
-            self.upload_history[session_id] = [
-                ts for ts in self.upload_history[session_id]
-                if ts > hour_ago
-            ]
+        for session_id, history in list(self.upload_history.items()):
+            while history and history[0] < cutoff:
+                history.popleft()
             
             # Remove empty entries
-            if not self.upload_history[session_id]:
+            if not history:
                 del self.upload_history[session_id]
 
 
 # Global rate limiter instance
 rate_limiter = RateLimiter(max_uploads_per_hour=10)
-
-
-async def rate_limit_middleware(request: Request, call_next):
-    """
-    Middleware to check rate limits for upload endpoints
-    """
-    # Only apply to upload endpoints
-    if request.url.path.startswith("/api/upload") and request.method == "POST":
-        # Get session ID from cookie
-        session_id = request.cookies.get("session_id")
-        
-        if session_id:
-            try:
-                rate_limiter.check_upload_rate(session_id)
-            except HTTPException as e:
-                return JSONResponse(
-                    status_code=e.status_code,
-                    content=e.detail
-                )
-    
-    response = await call_next(request)
-    return response
-
-
-# Import JSONResponse at the end to avoid circular import
-from fastapi.responses import JSONResponse
@@ -2,53 +2,74 @@
 Security headers middleware for FastAPI
 Adds security-related HTTP headers to all responses
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from typing import Final
 
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+
+# Content Security Policy (adjacent literals are joined at compile time)
+CONTENT_SECURITY_POLICY: Final[str] = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "img-src 'self' data: blob:; "
+    "font-src 'self' data:; "
+    "connect-src 'self'"
+)
+
+# Permissions policy (disable unnecessary features)
+PERMISSIONS_POLICY: Final[str] = "geolocation=(), microphone=(), camera=()"
+
+SECURITY_HEADERS = {
+    # Prevent MIME type sniffing
+    "X-Content-Type-Options": "nosniff",
+    
+    # Prevent clickjacking
+    "X-Frame-Options": "DENY",
+    
+    # Enable XSS filter in browsers
+    "X-XSS-Protection": "1; mode=block",
+    
+    # Strict transport security (HTTPS only)
+    # Only enable if running HTTPS
+    # "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    
+    # Content Security Policy
+    "Content-Security-Policy": CONTENT_SECURITY_POLICY,
+    
+    # Referrer policy
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    
+    # Permissions policy
+    "Permissions-Policy": PERMISSIONS_POLICY,
+}
+
+# Pre-encoded ASGI header pairs, built once at import
+RAW_SECURITY_HEADERS: Final[tuple] = tuple(
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in SECURITY_HEADERS.items()
+)
+
+
+class SecurityHeadersMiddleware:
     """
     Middleware to add security headers to all responses
+    Implemented as plain ASGI so responses are not re-buffered per request
     """
     
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-        
-        # Enable XSS filter in browsers
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        
-        # Strict transport security (HTTPS only)
-        # Only enable if running HTTPS
-        # response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        # Content Security Policy
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: blob:; "
-            "font-src 'self' data:; "
-            "connect-src 'self'"
-        )
-        
-        # Referrer policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Permissions policy (disable unnecessary features)
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), "
-            "microphone=(), "
-            "camera=()"
-        )
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # No route sets these headers, so append without scanning;
+                # a new list keeps the Response's own raw_headers untouched
+                message["headers"] = [*message.get("headers", ()), *RAW_SECURITY_HEADERS]
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,77 @@
+"""
+Upload preflight middleware for FastAPI
+Rejects oversized and rate-limited uploads before the body is read
+"""
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+import logging
+
+from app.middleware.cookies import get_cookie
+from app.middleware.rate_limiter import rate_limiter
+from app.services.file_service import MAX_FILE_SIZE
+from app.utils.errors import FileSizeExceededError
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadLimitMiddleware:
+    """
+    Middleware to reject uploads whose declared size exceeds the file limit
+    or whose session has exceeded the upload rate limit
+
+    FastAPI parses the multipart body before the upload handler and its
+    dependencies run, so both checks happen here to avoid receiving the
+    whole body first.
+    Implemented as plain ASGI; other requests pass straight through
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Only POST /api/upload is checked
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or not scope["path"].startswith("/api/upload")):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = 0
+        cookie_header = b""
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = 0
+            elif name == b"cookie":
+                # HTTP/2 clients may split cookies across several headers
+                cookie_header = cookie_header + b";" + value if cookie_header else value
+
+        if content_length > MAX_FILE_SIZE + MULTIPART_OVERHEAD_BYTES:
+            logger.warning(f"Rejected upload with Content-Length {content_length}")
+            error = FileSizeExceededError(content_length, MAX_FILE_SIZE)
+            response = JSONResponse(
+                status_code=413,
+                content=error.to_dict()
+            )
+            await response(scope, receive, send)
+            return
+
+        # Per-session upload rate limit, keyed by the session cookie
+        session_id = get_cookie(cookie_header, b"session_id")
+        if session_id:
+            try:
+                rate_limiter.check_upload_rate(session_id.decode("latin-1"))
+            except HTTPException as e:
+                response = JSONResponse(
+                    status_code=e.status_code,
+                    content=e.detail
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -3,63 +3,225 @@ Cleanup service for managing session expiration and file deletion
 """
 import os
 import shutil
+import stat
 import subprocess
 import platform
-from datetime import datetime, timedelta
-from typing import List, Tuple, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple, Dict
 from pathlib import Path
 import logging
 
-from app.db.database import get_db
-from app.db.models import Session
+try:
+    import fcntl
+except ImportError:  # Windows: sweeps are only serialized within a process
+    fcntl = None
+
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.orm import Session as DBSession
+
+from app.db.database import SessionLocal
+from app.db.models import Job, Session
 from app.services.disk_monitor import DiskMonitor
 
 logger = logging.getLogger(__name__)
 
+# Lock file shared by every process (API, Celery workers) that runs sweeps
+CLEANUP_LOCK_FILE = os.getenv("CLEANUP_LOCK_FILE", ".cleanup.lock")
+
+_sweep_thread_lock = threading.Lock()
+
+
+@contextmanager
+def _db_scope(db: Optional[DBSession]) -> Iterator[DBSession]:
+    """
+    Yield the caller's database session, or a new one closed on exit
+    
+    Lets a whole cleanup sweep share one session while single calls keep
+    working without one.
+    
+    Args:
+        db: Session owned by the caller, or None
+        
+    Yields:
+        Database session
+    """
+    if db is not None:
+        yield db
+        return
+    with SessionLocal() as db:
+        yield db
+
+# Single random overwrite pass, then unlink; "--" guards against names starting with "-"
+SHRED_COMMAND = ('shred', '-u', '-n', '1', '--')
+
+# Files passed to one shred invocation (keeps argv well under ARG_MAX)
+SHRED_BATCH_SIZE = 256
+
+# Filesystems where overwriting in place never reaches the original blocks
+# (copy-on-write, RAM-backed, or layered), so shred only costs I/O
+NO_SHRED_FILESYSTEMS = frozenset({
+    'tmpfs', 'ramfs', 'btrfs', 'zfs', 'overlay', 'aufs', 'bcachefs', 'f2fs'
+})
+
+
+@lru_cache(maxsize=None)
+def _shred_is_effective(device: int) -> bool:
+    """
+    Decide whether shred can overwrite data on a device, cached per st_dev
+    
+    Returns False for copy-on-write/RAM filesystems and for non-rotational
+    (SSD/NVMe) block devices, where wear-leveling remaps overwritten blocks.
+    Anything that cannot be determined is treated as rotational.
+    
+    Args:
+        device: st_dev of a file on the filesystem
+        
+    Returns:
+        True if files on this device should be shredded
+    """
+    dev_id = f"{os.major(device)}:{os.minor(device)}"
+    
+    try:
+        with open('/proc/self/mountinfo') as f:
+            for line in f:
+                fields = line.split()
+                if fields[2] == dev_id:
+                    fstype = fields[fields.index('-') + 1]
+                    if fstype in NO_SHRED_FILESYSTEMS:
+                        return False
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    # Partitions carry no queue/ directory; fall back to the parent disk's
+    sys_dev = os.path.realpath(f"/sys/dev/block/{dev_id}")
+    for queue_dir in (sys_dev, os.path.dirname(sys_dev)):
+        try:
+            with open(os.path.join(queue_dir, 'queue', 'rotational')) as f:
+                return f.read().strip() != '0'
+        except OSError:
+            continue
+    return True
+
 
 class CleanupService:
     """Service for cleaning up expired sessions and managing disk space"""
     
     SESSION_EXPIRY_HOURS = 24
     
+    # Upper bound on sessions deleted concurrently, to avoid saturating the disk
+    MAX_CLEANUP_WORKERS = 16
+    
+    # Session IDs per bulk DELETE statement (bounds the IN (...) parameter list)
+    DB_DELETE_BATCH_SIZE = 500
+    
+    # Emergency cleanup: sessions fetched per query and sessions deleted per step
+    EMERGENCY_FETCH_LIMIT = 1000
+    EMERGENCY_BATCH_SIZE = 5
+    
     @staticmethod
-    def get_expired_sessions() -> List[Session]:
+    def get_expired_sessions(db: Optional[DBSession] = None) -> List[Session]:
         """
         Find all sessions that have been idle for more than 24 hours
         
+        Args:
+            db: Database session to use (a temporary one if omitted)
+            
         Returns:
             List of expired Session objects
         """
-        db = next(get_db())
-        try:
-            expiry_time = datetime.utcnow() - timedelta(hours=CleanupService.SESSION_EXPIRY_HOURS)
+        with _db_scope(db) as db:
+            expiry_time = datetime.now(timezone.utc) - timedelta(hours=CleanupService.SESSION_EXPIRY_HOURS)
             expired = db.query(Session).filter(
                 Session.last_accessed < expiry_time
             ).all()
             return expired
-        finally:
-            db.close()
     
     @staticmethod
-    def get_oldest_sessions(limit: int = 10) -> List[Session]:
+    def get_oldest_sessions(
+        limit: int = 10,
+        db: Optional[DBSession] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[Session]:
         """
         Get the oldest sessions by last_accessed time
         Used for emergency cleanup
         
         Args:
             limit: Maximum number of sessions to return
+            db: Database session to use (a temporary one if omitted)
+            after: Keyset cursor (last_accessed, session_id); only sessions
+                ordered after it are returned
             
         Returns:
-            List of Session objects
+            List of Session objects, ordered by (last_accessed, session_id)
         """
-        db = next(get_db())
-        try:
-            sessions = db.query(Session).order_by(
-                Session.last_accessed.asc()
+        with _db_scope(db) as db:
+            query = db.query(Session)
+            if after is not None:
+                last_accessed, session_id = after
+                query = query.filter(or_(
+                    Session.last_accessed > last_accessed,
+                    and_(Session.last_accessed == last_accessed, Session.session_id > session_id)
+                ))
+            sessions = query.order_by(
+                Session.last_accessed.asc(),
+                Session.session_id.asc()
             ).limit(limit).all()
             return sessions
-        finally:
-            db.close()
+    
+    @staticmethod
+    def secure_delete_files(file_paths: List[str]) -> bool:
+        """
+        Securely delete files using shred on Linux, otherwise normal delete
+        
+        Files are handed to shred in batches so a directory costs one
+        process spawn rather than one per file. Symlinks are only unlinked,
+        never shredded, since shred would overwrite their targets; the same
+        applies to files with other hard links (deduplicated uploads). Files on
+        SSDs and copy-on-write/RAM filesystems are unlinked directly, as
+        overwriting them gives no guarantee. Anything shred could not
+        remove is deleted normally.
+        
+        Args:
+            file_paths: Paths of files to delete
+            
+        Returns:
+            True if every file was removed
+        """
+        if platform.system() == 'Linux':
+            shred_paths = []
+            for path in file_paths:
+                try:
+                    stat_result = os.lstat(path)
+                except OSError:
+                    continue
+                # Hard-linked uploads share data with another session's file
+                if (not stat.S_ISLNK(stat_result.st_mode) and stat_result.st_nlink == 1
+                        and _shred_is_effective(stat_result.st_dev)):
+                    shred_paths.append(path)
+            for start in range(0, len(shred_paths), SHRED_BATCH_SIZE):
+                batch = shred_paths[start:start + SHRED_BATCH_SIZE]
+                try:
+                    subprocess.run([*SHRED_COMMAND, *batch], check=False, capture_output=True)
+                except Exception as e:
+                    logger.error(f"Failed to securely delete {len(batch)} file(s): {e}")
+        
+        # Regular delete for other platforms and as fallback for shred failures
+        success = True
+        for file_path in file_paths:
+            if not os.path.lexists(file_path):
+                continue
+            try:
+                os.remove(file_path)
+            except OSError as e:
+                logger.error(f"Failed to delete {file_path}: {e}")
+                success = False
+        return success
     
     @staticmethod
     def secure_delete_file(file_path: str) -> bool:
@@ -72,23 +234,7 @@ class CleanupService:
         Returns:
             True if successful
         """
-        try:
-            if platform.system() == 'Linux':
-                # Use shred for secure deletion on Linux
-                subprocess.run(['shred', '-u', '-z', '-n', '3', file_path], 
-                             check=False, capture_output=True)
-            else:
-                # Fallback to normal deletion on other platforms
-                os.remove(file_path)
-            return True
-        except Exception as e:
-            logger.error(f"Failed to securely delete {file_path}: {e}")
-            # Try regular delete as fallback
-            try:
-                os.remove(file_path)
-                return True
-            except:
-                return False
+        return CleanupService.secure_delete_files([file_path])
     
     @staticmethod
     def secure_delete_directory(dir_path: str) -> bool:
@@ -102,22 +248,38 @@ class CleanupService:
             True if successful
         """
         try:
-            if not os.path.exists(dir_path):
-                return True
-            
-            # Securely delete all files first
-            for root, dirs, files in os.walk(dir_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    CleanupService.secure_delete_file(file_path)
-            
-            # Remove empty directory structure
-            shutil.rmtree(dir_path, ignore_errors=True)
+            CleanupService._secure_delete_tree(dir_path)
             return True
         except Exception as e:
             logger.error(f"Failed to securely delete directory {dir_path}: {e}")
             return False
     
+    @staticmethod
+    def _secure_delete_tree(dir_path: str) -> int:
+        """
+        Securely delete a directory tree; a missing directory is a no-op
+        
+        os.walk yields nothing and rmtree(ignore_errors=True) tolerates a
+        missing path, so no existence check is needed up front.
+        
+        Args:
+            dir_path: Path to directory
+            
+        Returns:
+            Number of files that were found and deleted
+        """
+        # Securely delete all files first
+        file_paths = [
+            os.path.join(root, file)
+            for root, dirs, files in os.walk(dir_path)
+            for file in files
+        ]
+        CleanupService.secure_delete_files(file_paths)
+        
+        # Remove empty directory structure
+        shutil.rmtree(dir_path, ignore_errors=True)
+        return len(file_paths)
+    
     @staticmethod
     def delete_session_files(session_id: str) -> Tuple[bool, str]:
         """
@@ -135,17 +297,12 @@ class CleanupService:
             
             deleted_count = 0
             
-            # Securely delete uploads directory
-            if os.path.exists(uploads_dir):
-                CleanupService.secure_delete_directory(uploads_dir)
-                deleted_count += 1
-                logger.info(f"Securely deleted uploads directory: {uploads_dir}")
-            
-            # Securely delete results directory
-            if os.path.exists(results_dir):
-                CleanupService.secure_delete_directory(results_dir)
-                deleted_count += 1
-                logger.info(f"Securely deleted results directory: {results_dir}")
+            # Securely delete uploads and results directories; only those
+            # that contained files count towards the result
+            for dir_path, label in ((uploads_dir, "uploads"), (results_dir, "results")):
+                if CleanupService._secure_delete_tree(dir_path):
+                    deleted_count += 1
+                    logger.info(f"Securely deleted {label} directory: {dir_path}")
             
             if deleted_count == 0:
                 return True, "No files to delete"
@@ -158,34 +315,64 @@ class CleanupService:
             return False, error_msg
     
     @staticmethod
-    def delete_session_from_db(session_id: str) -> Tuple[bool, str]:
+    def delete_session_from_db(session_id: str, db: Optional[DBSession] = None) -> Tuple[bool, str]:
         """
         Delete session record from database
         
         Args:
             session_id: Session identifier
+            db: Database session to use (a temporary one if omitted)
             
         Returns:
             Tuple of (success, message)
         """
-        db = next(get_db())
-        try:
-            session = db.query(Session).filter(Session.session_id == session_id).first()
-            if not session:
-                return False, "Session not found"
-            
-            db.delete(session)
-            db.commit()
-            logger.info(f"Deleted session from database: {session_id}")
-            return True, "Session deleted from database"
+        with _db_scope(db) as db:
+            try:
+                session = db.get(Session, session_id)
+                if not session:
+                    return False, "Session not found"
+                
+                db.delete(session)
+                db.commit()
+                logger.info(f"Deleted session from database: {session_id}")
+                return True, "Session deleted from database"
+                
+            except Exception as e:
+                db.rollback()
+                error_msg = f"Failed to delete session {session_id} from database: {str(e)}"
+                logger.error(error_msg)
+                return False, error_msg
+    
+    @classmethod
+    def delete_sessions_from_db(cls, session_ids: List[str], db: Optional[DBSession] = None) -> Tuple[set, str]:
+        """
+        Delete several session records (and their jobs) in one transaction
+        
+        Args:
+            session_ids: Session identifiers
+            db: Database session to use (a temporary one if omitted)
             
-        except Exception as e:
-            db.rollback()
-            error_msg = f"Failed to delete session {session_id} from database: {str(e)}"
-            logger.error(error_msg)
-            return False, error_msg
-        finally:
-            db.close()
+        Returns:
+            Tuple of (set of session IDs that were deleted, error message or "")
+        """
+        with _db_scope(db) as db:
+            deleted = set()
+            try:
+                for start in range(0, len(session_ids), cls.DB_DELETE_BATCH_SIZE):
+                    batch = session_ids[start:start + cls.DB_DELETE_BATCH_SIZE]
+                    db.execute(delete(Job).where(Job.session_id.in_(batch)))
+                    deleted.update(db.scalars(
+                        delete(Session).where(Session.session_id.in_(batch)).returning(Session.session_id)
+                    ))
+                db.commit()
+                logger.info(f"Deleted {len(deleted)} sessions from database")
+                return deleted, ""
+                
+            except Exception as e:
+                db.rollback()
+                error_msg = f"Failed to delete {len(session_ids)} sessions from database: {str(e)}"
+                logger.error(error_msg)
+                return set(), error_msg
     
     @classmethod
     def cleanup_session(cls, session_id: str) -> Tuple[bool, str]:
@@ -212,86 +399,222 @@ class CleanupService:
             return False, f"Cleanup failed - Files: {files_msg}, DB: {db_msg}"
     
     @classmethod
-    def cleanup_expired_sessions(cls) -> Dict[str, any]:
+    def cleanup_sessions(
+        cls,
+        session_ids: Iterable[str],
+        db: Optional[DBSession] = None
+    ) -> List[Tuple[str, bool, str]]:
         """
-        Clean up all expired sessions
+        Clean up several sessions: files concurrently, database in one commit
         
+        File deletion is dominated by blocking shred/rmtree calls, so sessions
+        are processed on a bounded thread pool. The database rows are then
+        removed with bulk DELETEs committed once, instead of one commit per
+        session.
+        
+        Args:
+            session_ids: Session identifiers to clean up
+            db: Database session to use (a temporary one if omitted)
+            
         Returns:
-            Dictionary with cleanup results
+            List of (session_id, success, message) tuples in input order
         """
-        expired_sessions = cls.get_expired_sessions()
+        session_ids = list(session_ids)
+        if not session_ids:
+            return []
         
-        results = {
-            "total_expired": len(expired_sessions),
-            "cleaned": 0,
-            "failed": 0,
-            "errors": []
-        }
+        # Delete files first
+        workers = min(cls.MAX_CLEANUP_WORKERS, len(session_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="session-cleanup") as executor:
+            futures = [executor.submit(cls.delete_session_files, session_id) for session_id in session_ids]
         
-        for session in expired_sessions:
-            success, msg = cls.cleanup_session(session.session_id)
-            if success:
-                results["cleaned"] += 1
+        # Then delete from database
+        deleted, db_msg = cls.delete_sessions_from_db(session_ids, db=db)
+        DiskMonitor.invalidate_cached_disk_usage()
+        
+        outcomes = []
+        for session_id, future in zip(session_ids, futures):
+            try:
+                files_success, files_msg = future.result()
+            except Exception as e:
+                files_success, files_msg = False, str(e)
+            
+            if session_id not in deleted:
+                outcome = (False, f"Cleanup failed - Files: {files_msg}, DB: {db_msg or 'Session not found'}")
+            elif files_success:
+                outcome = (True, f"Session {session_id} fully cleaned up")
             else:
-                results["failed"] += 1
-                results["errors"].append({
-                    "session_id": session.session_id,
-                    "error": msg
-                })
+                outcome = (True, f"Session deleted but file cleanup had issues: {files_msg}")
+            outcomes.append((session_id, *outcome))
+        return outcomes
+    
+    @staticmethod
+    @contextmanager
+    def sweep_lock() -> Iterator[bool]:
+        """
+        Try to take the cleanup sweep lock without waiting
         
-        logger.info(f"Cleanup completed: {results['cleaned']} cleaned, {results['failed']} failed")
-        return results
+        Held across threads via a process-wide lock and across processes via
+        an flock on CLEANUP_LOCK_FILE, so a sweep triggered while another is
+        still running (beat schedule, manual endpoint, disk check) backs off.
+        
+        Yields:
+            True if the lock was acquired, False if a sweep is in progress
+        """
+        if not _sweep_thread_lock.acquire(blocking=False):
+            yield False
+            return
+        
+        lock_file = None
+        try:
+            if fcntl is not None:
+                lock_file = open(CLEANUP_LOCK_FILE, "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+            yield True
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # Closing releases the flock
+            _sweep_thread_lock.release()
     
     @classmethod
-    def emergency_cleanup(cls, target_free_gb: float = 10) -> Dict[str, any]:
+    def cleanup_expired_sessions(cls) -> Dict[str, any]:
         """
-        Emergency cleanup when disk space is critically low
-        Deletes oldest sessions until target free space is achieved
+        Clean up all expired sessions
+        Returns {"skipped": True} if another sweep is already running
         
-        Args:
-            target_free_gb: Target free space in GB
-            
         Returns:
             Dictionary with cleanup results
         """
-        logger.warning("Emergency cleanup triggered due to low disk space")
-        
-        results = {
-            "initial_free_gb": 0,
-            "final_free_gb": 0,
-            "sessions_cleaned": 0,
-            "errors": []
-        }
-        
-        # Get initial disk usage
-        initial_usage = DiskMonitor.get_disk_usage()
-        results["initial_free_gb"] = initial_usage["free_gb"]
+        with cls.sweep_lock() as acquired:
+            if not acquired:
+                logger.info("Session cleanup already in progress, skipping")
+                return {"skipped": True}
+            return cls._cleanup_expired_sessions()
+    
+    @classmethod
+    def _cleanup_expired_sessions(cls) -> Dict[str, any]:
+        """
+        Clean up all expired sessions (caller holds the sweep lock)
         
-        # Clean oldest sessions until we reach target
-        while True:
-            current_usage = DiskMonitor.get_disk_usage()
-            if current_usage["free_gb"] >= target_free_gb:
-                break
+        Returns:
+            Dictionary with cleanup results
+        """
+        # One database session for the whole sweep
+        with SessionLocal() as db:
+            expired_sessions = cls.get_expired_sessions(db=db)
             
-            # Get batch of oldest sessions
-            old_sessions = cls.get_oldest_sessions(limit=5)
-            if not old_sessions:
-                logger.warning("No more sessions to clean, but target not reached")
-                break
+            results = {
+                "total_expired": len(expired_sessions),
+                "cleaned": 0,
+                "failed": 0,
+                "errors": []
+            }
             
-            for session in old_sessions:
-                success, msg = cls.cleanup_session(session.session_id)
+            outcomes = cls.cleanup_sessions((session.session_id for session in expired_sessions), db=db)
+            for session_id, success, msg in outcomes:
                 if success:
-                    results["sessions_cleaned"] += 1
+                    results["cleaned"] += 1
                 else:
+                    results["failed"] += 1
                     results["errors"].append({
-                        "session_id": session.session_id,
+                        "session_id": session_id,
                         "error": msg
                     })
+            
+            logger.info(f"Cleanup completed: {results['cleaned']} cleaned, {results['failed']} failed")
+            return results
+    
+    @classmethod
+    def emergency_cleanup(cls, target_free_gb: float = 10) -> Dict[str, any]:
+        """
+        Emergency cleanup when disk space is critically low
+        Deletes oldest sessions until target free space is achieved.
+        Returns {"skipped": True} if another sweep is already running.
+        
+        Candidates are fetched up to EMERGENCY_FETCH_LIMIT at a time and
+        deleted in batches of EMERGENCY_BATCH_SIZE, with free space measured
+        after each batch.
         
-        # Get final disk usage
-        final_usage = DiskMonitor.get_disk_usage()
-        results["final_free_gb"] = final_usage["free_gb"]
+        Args:
+            target_free_gb: Target free space in GB
+            
+        Returns:
+            Dictionary with cleanup results
+        """
+        with cls.sweep_lock() as acquired:
+            if not acquired:
+                logger.info("Cleanup already in progress, skipping emergency cleanup")
+                return {"skipped": True}
+            return cls._emergency_cleanup(target_free_gb)
+    
+    @classmethod
+    def _emergency_cleanup(cls, target_free_gb: float = 10) -> Dict[str, any]:
+        """
+        Emergency cleanup body (caller holds the sweep lock)
         
-        logger.info(f"Emergency cleanup completed: {results}")
-        return results
+        Args:
+            target_free_gb: Target free space in GB
+            
+        Returns:
+            Dictionary with cleanup results
+        """
+        # One database session for the whole sweep
+        with SessionLocal() as db:
+            logger.warning("Emergency cleanup triggered due to low disk space")
+            
+            results = {
+                "initial_free_gb": 0,
+                "final_free_gb": 0,
+                "sessions_cleaned": 0,
+                "errors": []
+            }
+            
+            # Get initial disk usage
+            initial_usage = DiskMonitor.get_disk_usage()
+            results["initial_free_gb"] = initial_usage["free_gb"]
+            
+            free_gb = initial_usage["free_gb"]
+            cursor = None
+            
+            # Clean oldest sessions until we reach target
+            while free_gb < target_free_gb:
+                # Page past sessions already tried; failed deletions stay in
+                # the table and must not be fetched again
+                candidates = [
+                    (session.last_accessed, session.session_id)
+                    for session in cls.get_oldest_sessions(
+                        limit=cls.EMERGENCY_FETCH_LIMIT, db=db, after=cursor
+                    )
+                ]
+                if not candidates:
+                    logger.warning("No more sessions to clean, but target not reached")
+                    break
+                cursor = candidates[-1]
+                
+                for start in range(0, len(candidates), cls.EMERGENCY_BATCH_SIZE):
+                    batch = [session_id for _, session_id in candidates[start:start + cls.EMERGENCY_BATCH_SIZE]]
+                    
+                    outcomes = cls.cleanup_sessions(batch, db=db)
+                    for session_id, success, msg in outcomes:
+                        if success:
+                            results["sessions_cleaned"] += 1
+                        else:
+                            results["errors"].append({
+                                "session_id": session_id,
+                                "error": msg
+                            })
+                    
+                    free_gb = DiskMonitor.get_disk_usage()["free_gb"]
+                    if free_gb >= target_free_gb:
+                        break
+            
+            # Get final disk usage
+            final_usage = DiskMonitor.get_disk_usage()
+            results["final_free_gb"] = final_usage["free_gb"]
+            
+            logger.info(f"Emergency cleanup completed: {results}")
+            return results
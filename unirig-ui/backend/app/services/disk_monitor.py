@@ -3,9 +3,11 @@ Disk space monitoring service for triggering emergency cleanup
 """
 import os
 import shutil
-from typing import Dict
+from typing import Dict, Optional, Tuple
 import logging
 
+from app.utils.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,10 @@ class DiskMonitor:
     EMERGENCY_THRESHOLD_GB = 5
     WARNING_THRESHOLD_GB = 10
     
+    # Short-lived cache for polled endpoints; free space barely moves in 2s
+    USAGE_CACHE_TTL_SECONDS = 2.0
+    _usage_cache = TTLCache(maxsize=16, ttl=USAGE_CACHE_TTL_SECONDS)
+    
     @staticmethod
     def get_disk_usage(path: str = "/") -> Dict[str, float]:
         """
@@ -42,15 +48,39 @@ class DiskMonitor:
             }
     
     @classmethod
-    def is_low_disk_space(cls, path: str = "/") -> bool:
-        """Check if disk space is below emergency threshold"""
-        usage = cls.get_disk_usage(path)
+    def get_cached_disk_usage(cls, path: str = "/") -> Dict[str, float]:
+        """
+        Get disk usage statistics, reusing a result up to 2 seconds old
+        
+        Intended for frequently polled endpoints. Cleanup code that needs to
+        observe freed space should call get_disk_usage() directly.
+        
+        Returns:
+            Dict with total, used, free, and percent values in GB
+        """
+        usage = cls._usage_cache.get(path)
+        if usage is None:
+            usage = cls.get_disk_usage(path)
+            cls._usage_cache.set(path, usage)
+        return usage
+    
+    @classmethod
+    def invalidate_cached_disk_usage(cls) -> None:
+        """Drop cached usage so the next read reflects space just freed"""
+        cls._usage_cache.clear()
+    
+    @classmethod
+    def is_low_disk_space(cls, path: str = "/", usage: Optional[Dict[str, float]] = None) -> bool:
+        """Check if disk space is below emergency threshold (reuses usage if given, else cached)"""
+        if usage is None:
+            usage = cls.get_cached_disk_usage(path)
         return usage["free_gb"] < cls.EMERGENCY_THRESHOLD_GB
     
     @classmethod
-    def needs_warning(cls, path: str = "/") -> bool:
-        """Check if disk space is below warning threshold"""
-        usage = cls.get_disk_usage(path)
+    def needs_warning(cls, path: str = "/", usage: Optional[Dict[str, float]] = None) -> bool:
+        """Check if disk space is below warning threshold (reuses usage if given, else cached)"""
+        if usage is None:
+            usage = cls.get_cached_disk_usage(path)
         return usage["free_gb"] < cls.WARNING_THRESHOLD_GB
     
     @classmethod
@@ -64,14 +94,40 @@ class DiskMonitor:
         Returns:
             Size in GB
         """
+        total, _ = cls.get_directory_size_and_count(path)
+        return total / (1024 ** 3)
+
+    @staticmethod
+    def get_directory_size_and_count(path: str) -> Tuple[int, int]:
+        """
+        Calculate total size and file count of a directory in a single pass
+
+        Uses os.scandir so the stat data returned with each directory entry
+        is reused instead of issuing a separate stat per file.
+
+        Args:
+            path: Directory path
+
+        Returns:
+            Tuple of (size in bytes, number of files); (0, 0) if missing
+        """
         total = 0
+        count = 0
+        stack = [path]
         try:
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total += os.path.getsize(filepath)
+            while stack:
+                try:
+                    iterator = os.scandir(stack.pop())
+                except FileNotFoundError:
+                    continue
+                with iterator:
+                    for entry in iterator:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                            count += 1
         except Exception as e:
             logger.error(f"Failed to calculate directory size for {path}: {e}")
-        
-        return total / (1024 ** 3)
+
+        return total, count
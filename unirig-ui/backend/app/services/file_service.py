@@ -4,21 +4,26 @@ Manages session-specific file directories and cleanup operations.
 """
 
 import os
+import re
+import stat
 import uuid
 import shutil
+import hashlib
+import aiofiles
 import magic
 import subprocess
 from pathlib import Path
-from typing import Tuple, Set
+from typing import Optional, Tuple, Set
 from fastapi import UploadFile
 
 from app.config import settings
+from app.utils.cache import TTLCache
 from app.utils.errors import InvalidFormatError, FileSizeExceededError, SecurityError
-from app.utils.validation import is_valid_file_extension, get_file_extension
+from app.utils.validation import get_file_extension
 
 
 # Constants
-ALLOWED_EXTENSIONS = {".obj", ".fbx", ".glb", ".vrm"}
+ALLOWED_EXTENSIONS = frozenset({".obj", ".fbx", ".glb", ".vrm"})
 ALLOWED_MIME_TYPES = {
     "model/obj",
     "model/gltf-binary",
@@ -28,7 +33,40 @@ ALLOWED_MIME_TYPES = {
     "text/plain",  # OBJ files are often detected as plain text
 }
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
-CHUNK_SIZE = 8192  # 8KB chunks for async file writing
+CHUNK_SIZE = 1024 * 1024  # 1MiB chunks for async file writing
+SIGNATURE_SCAN_BYTES = 4096  # Leading bytes checked for executable signatures
+
+# Common executable signatures, matched in a single pass over the header
+EXECUTABLE_SIGNATURES = (
+    b'\x7fELF',  # Linux ELF
+    b'MZ',  # Windows PE
+    b'#!',  # Shell script
+    b'<?php',  # PHP script
+    b'<script',  # JavaScript
+)
+EXECUTABLE_SIGNATURE_PATTERN = re.compile(b"|".join(re.escape(sig) for sig in EXECUTABLE_SIGNATURES))
+
+# SHA-256 of recently validated uploads -> stored path, so re-uploads of the
+# same model skip the content checks and share storage via a hard link
+VALIDATED_UPLOAD_CACHE_TTL_SECONDS = 24 * 3600
+_validated_uploads = TTLCache(maxsize=4096, ttl=VALIDATED_UPLOAD_CACHE_TTL_SECONDS)
+
+# Shared libmagic cookie; loading the magic database is the expensive part.
+# python-magic serializes calls on a Magic instance with its own lock.
+_mime_magic: Optional[magic.Magic] = None
+
+
+def _get_mime_magic() -> magic.Magic:
+    """
+    Return the shared MIME-detecting libmagic instance, creating it on first use.
+    
+    Returns:
+        magic.Magic configured with mime=True
+    """
+    global _mime_magic
+    if _mime_magic is None:
+        _mime_magic = magic.Magic(mime=True)
+    return _mime_magic
 
 
 class FileService:
@@ -53,18 +91,20 @@ class FileService:
         """
         ext = get_file_extension(file.filename)
         
-        if not is_valid_file_extension(file.filename, ALLOWED_EXTENSIONS):
+        if ext not in ALLOWED_EXTENSIONS:
             raise InvalidFormatError(ext)
         
         return True
     
     @staticmethod
-    def validate_mime_type(file_path: str) -> bool:
+    def validate_mime_type(file_path: str, header: Optional[bytes] = None) -> bool:
         """
         Validate MIME type of uploaded file using python-magic.
         
         Args:
             file_path: Path to the uploaded file
+            header: Leading bytes of the file already in memory; when given,
+                the type is detected from them instead of re-reading the file
             
         Returns:
             True if MIME type is allowed
@@ -76,8 +116,11 @@ class FileService:
         logger = logging.getLogger(__name__)
         
         try:
-            mime = magic.Magic(mime=True)
-            file_mime_type = mime.from_file(file_path)
+            mime = _get_mime_magic()
+            if header is not None:
+                file_mime_type = mime.from_buffer(header)
+            else:
+                file_mime_type = mime.from_file(file_path)
             
             logger.info(f"Detected MIME type: {file_mime_type} for file: {file_path}")
             
@@ -102,13 +145,15 @@ class FileService:
             raise SecurityError(f"MIME type validation failed: {str(e)}")
     
     @staticmethod
-    def scan_for_malicious_content(file_path: str) -> bool:
+    def scan_for_malicious_content(file_path: str, header: Optional[bytes] = None) -> bool:
         """
         Scan file for malicious content patterns.
         Checks for embedded scripts, null bytes, and suspicious patterns.
         
         Args:
             file_path: Path to the uploaded file
+            header: Leading bytes of the file already in memory; when given,
+                they are scanned instead of re-reading the file
             
         Returns:
             True if file is safe
@@ -122,21 +167,15 @@ class FileService:
                 raise SecurityError("Null byte detected in filename")
             
             # Read first few KB to check for scripts/executables
-            with open(file_path, 'rb') as f:
-                header = f.read(4096)
-                
-                # Check for common executable signatures
-                executable_signatures = [
-                    b'\x7fELF',  # Linux ELF
-                    b'MZ',  # Windows PE
-                    b'#!',  # Shell script
-                    b'<?php',  # PHP script
-                    b'<script',  # JavaScript
-                ]
-                
-                for sig in executable_signatures:
-                    if sig in header:
-                        raise SecurityError(f"Executable signature detected")
+            if header is None:
+                with open(file_path, 'rb') as f:
+                    header = f.read(SIGNATURE_SCAN_BYTES)
+            else:
+                header = header[:SIGNATURE_SCAN_BYTES]
+            
+            # Check for common executable signatures
+            if EXECUTABLE_SIGNATURE_PATTERN.search(header):
+                raise SecurityError(f"Executable signature detected")
             
             return True
             
@@ -146,28 +185,39 @@ class FileService:
             raise SecurityError(f"Malicious content scan failed: {str(e)}")
     
     @staticmethod
-    async def save_upload(file: UploadFile, session_id: str) -> Tuple[str, str, int]:
+    async def save_upload(file: UploadFile, session_id: str) -> Tuple[str, str, int, str]:
         """
         Save uploaded file to session-specific directory with security checks.
-        Writes file in 8KB chunks for memory efficiency.
+        Streams the file in 1MiB chunks, computing its size and SHA-256 in the
+        same pass, and stops as soon as the size limit is exceeded.
         
         Args:
             file: FastAPI UploadFile object
             session_id: Session identifier for directory isolation
             
         Returns:
-            Tuple of (file_path, original_filename, file_size)
+            Tuple of (file_path, original_filename, file_size, sha256 hex digest)
             
         Raises:
             SecurityError: If security validation fails
             FileSizeExceededError: If file exceeds size limit
             
         Example:
-            file_path, filename, size = await FileService.save_upload(file, session_id)
+            file_path, filename, size, sha256 = await FileService.save_upload(file, session_id)
         """
         # Validate extension first
         FileService.validate_file(file)
         
+        # Reject on the declared size before touching the upload directory;
+        # Starlette records the part size while spooling, and a part may also
+        # carry its own Content-Length
+        try:
+            declared_size = file.size or int(file.headers.get("content-length") or 0)
+        except ValueError:
+            declared_size = 0
+        if declared_size > MAX_FILE_SIZE:
+            raise FileSizeExceededError(declared_size, MAX_FILE_SIZE)
+        
         # Prevent path traversal in session_id and filename
         safe_session_id = os.path.basename(session_id)
         safe_original_filename = os.path.basename(file.filename)
@@ -180,32 +230,82 @@ class FileService:
         safe_filename = f"{uuid.uuid4()}_{safe_original_filename}"
         file_path = upload_dir / safe_filename
         
-        # Write file in chunks (8KB) for async operation
+        # Stream file to disk, hashing and sizing in the same loop; the first
+        # chunk is kept as the header for the content checks below
         file_size = 0
-        with open(file_path, "wb") as buffer:
+        header = b""
+        hasher = hashlib.sha256()
+        async with aiofiles.open(file_path, "wb", buffering=CHUNK_SIZE) as buffer:
             while chunk := await file.read(CHUNK_SIZE):
-                buffer.write(chunk)
+                if not file_size:
+                    header = chunk
                 file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    break
+                hasher.update(chunk)
+                await buffer.write(chunk)
         
-        # Validate file size after upload
+        # Validate file size; the write loop stops early on oversized files
         if file_size > MAX_FILE_SIZE:
-            # Remove the file if it exceeds limit
+            # Remove the partial file
             os.remove(file_path)
             raise FileSizeExceededError(file_size, MAX_FILE_SIZE)
         
         # Set restrictive file permissions (owner read/write only)
         os.chmod(file_path, 0o600)
         
-        # Security validations after file is written
+        # Identical content was already validated: share its storage and skip
+        # the checks
+        content_hash = hasher.hexdigest()
+        if FileService._link_validated_duplicate(content_hash, file_path, file_size):
+            return str(file_path), file.filename, file_size, content_hash
+        
+        # Security validations on the in-memory header (up to CHUNK_SIZE bytes,
+        # libmagic's default read limit) without reopening the file
         try:
-            FileService.validate_mime_type(str(file_path))
-            FileService.scan_for_malicious_content(str(file_path))
+            FileService.validate_mime_type(str(file_path), header=header)
+            FileService.scan_for_malicious_content(str(file_path), header=header)
         except SecurityError:
             # Remove file if security validation fails
             os.remove(file_path)
             raise
         
-        return str(file_path), file.filename, file_size
+        _validated_uploads.set(content_hash, str(file_path))
+        return str(file_path), file.filename, file_size, content_hash
+    
+    @staticmethod
+    def _link_validated_duplicate(content_hash: str, file_path: Path, file_size: int) -> bool:
+        """
+        Replace a just-written upload with a hard link to a validated copy.
+        
+        Args:
+            content_hash: SHA-256 hex digest of the upload
+            file_path: Path the upload was written to
+            file_size: Size of the upload in bytes
+            
+        Returns:
+            True if the upload now shares an already validated file's inode
+        """
+        existing_path = _validated_uploads.get(content_hash)
+        if existing_path is None:
+            return False
+        
+        link_path = file_path.with_name(file_path.name + ".link")
+        try:
+            if os.stat(existing_path).st_size != file_size:
+                raise FileNotFoundError(existing_path)
+            os.link(existing_path, link_path)
+            os.replace(link_path, file_path)
+        except OSError:
+            # Original was cleaned up or lives on another filesystem
+            _validated_uploads.pop(content_hash)
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            return False
+        
+        # Point at the newest copy, which outlives the older sessions' files
+        _validated_uploads.set(content_hash, str(file_path))
+        return True
     
     @staticmethod
     def get_file_size(file_path: str) -> int:
@@ -221,10 +321,10 @@ class FileService:
         Raises:
             FileNotFoundError: If file doesn't exist
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        return os.path.getsize(file_path)
+        try:
+            return os.stat(file_path).st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}") from None
     
     @staticmethod
     def delete_session_files(session_id: str) -> None:
@@ -275,4 +375,7 @@ class FileService:
         Returns:
             True if file exists, False otherwise
         """
-        return os.path.exists(file_path) and os.path.isfile(file_path)
+        try:
+            return stat.S_ISREG(os.stat(file_path).st_mode)
+        except (OSError, ValueError):
+            return False
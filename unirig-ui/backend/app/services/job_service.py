@@ -4,16 +4,23 @@ Handles CRUD operations for jobs using SQLAlchemy ORM.
 """
 
 import uuid
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, exists, func, select, update
 
 from app.db.models import Job as JobModel
 from app.models.job import Job, JobCreate, JobUpdate, JobStatus, JobStage, JobResults
+from app.utils.cache import TTLCache
 from app.utils.errors import JobNotFoundError
 
 
+_ACTIVE_STATUSES = [JobStatus.QUEUED.value, JobStatus.PROCESSING.value]
+
+# Sub-second cache for status polling; absorbs bursts of polls between updates
+JOB_POLL_CACHE_TTL_SECONDS = 0.5
+_job_poll_cache = TTLCache(maxsize=10000, ttl=JOB_POLL_CACHE_TTL_SECONDS)
+
 class JobService:
     """
     Service class for job management.
@@ -63,7 +70,6 @@ class JobService:
         
         self.db.add(db_job)
         self.db.commit()
-        self.db.refresh(db_job)
         
         return self._model_to_pydantic(db_job)
     
@@ -80,13 +86,34 @@ class JobService:
         Raises:
             JobNotFoundError: If job doesn't exist
         """
-        db_job = self.db.query(JobModel).filter(JobModel.job_id == job_id).first()
+        db_job = self.db.get(JobModel, job_id)
         
         if not db_job:
             raise JobNotFoundError(job_id)
         
         return self._model_to_pydantic(db_job)
     
+    def get_job_cached(self, job_id: str) -> Job:
+        """
+        Retrieve a job by ID, reusing a result fetched within the last 0.5s.
+        Intended for the polled status endpoint only; updates and deletes
+        made through this process invalidate the entry immediately.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Job object
+            
+        Raises:
+            JobNotFoundError: If job doesn't exist
+        """
+        job = _job_poll_cache.get(job_id)
+        if job is None:
+            job = self.get_job(job_id)
+            _job_poll_cache.set(job_id, job)
+        return job
+    
     def update_job(
         self,
         job_id: str,
@@ -118,34 +145,38 @@ class JobService:
         Raises:
             JobNotFoundError: If job doesn't exist
         """
-        db_job = self.db.query(JobModel).filter(JobModel.job_id == job_id).first()
-        
-        if not db_job:
-            raise JobNotFoundError(job_id)
-        
         # Update fields if provided
-        if status is not None:
-            db_job.status = status.value if isinstance(status, JobStatus) else status
-        if progress is not None:
-            db_job.progress = max(0.0, min(1.0, progress))  # Clamp to [0, 1]
-        if stage is not None:
-            db_job.stage = stage.value if isinstance(stage, JobStage) else stage
-        if error_message is not None:
-            db_job.error_message = error_message
-        if skeleton_file is not None:
-            db_job.skeleton_file = skeleton_file
-        if skin_file is not None:
-            db_job.skin_file = skin_file
-        if final_file is not None:
-            db_job.final_file = final_file
+        values = {
+            "status": status,
+            "progress": max(0.0, min(1.0, progress)) if progress is not None else None,  # Clamp to [0, 1]
+            "stage": stage,
+            "error_message": error_message,
+            "skeleton_file": skeleton_file,
+            "skin_file": skin_file,
+            "final_file": final_file,
+        }
+        values = {field: value for field, value in values.items() if value is not None}
         
         # Update timestamp
-        db_job.updated_at = datetime.utcnow()
+        values["updated_at"] = datetime.now(timezone.utc)
         
+        # Single UPDATE ... RETURNING; no SELECT before or refresh after
+        db_job = self.db.scalars(
+            update(JobModel)
+            .where(JobModel.job_id == job_id)
+            .values(**values)
+            .returning(JobModel),
+            execution_options={"populate_existing": True}
+        ).first()
+        
+        if not db_job:
+            raise JobNotFoundError(job_id)
+        
+        job = self._model_to_pydantic(db_job)
         self.db.commit()
-        self.db.refresh(db_job)
+        _job_poll_cache.pop(job_id)
         
-        return self._model_to_pydantic(db_job)
+        return job
     
     def delete_job(self, job_id: str) -> bool:
         """
@@ -160,13 +191,14 @@ class JobService:
         Raises:
             JobNotFoundError: If job doesn't exist
         """
-        db_job = self.db.query(JobModel).filter(JobModel.job_id == job_id).first()
+        db_job = self.db.get(JobModel, job_id)
         
         if not db_job:
             raise JobNotFoundError(job_id)
         
         self.db.delete(db_job)
         self.db.commit()
+        _job_poll_cache.pop(job_id)
         
         return True
     
@@ -251,6 +283,80 @@ class JobService:
         
         return [self._model_to_pydantic(job) for job in db_jobs]
     
+    def claim_for_trigger(
+        self,
+        job_id: str,
+        require_skeleton: bool = False
+    ) -> Tuple[Job, int]:
+        """
+        Atomically queue a job if its session has no active jobs.
+        
+        The concurrency check and the status write happen in a single
+        conditional UPDATE ... RETURNING, so two concurrent triggers cannot
+        both pass the check. Only when the claim fails is the job re-read
+        to report why.
+        
+        Args:
+            job_id: Job identifier
+            require_skeleton: Also require a generated skeleton file
+            
+        Returns:
+            Tuple of (job, active job count). An active count of 0 means the
+            job was claimed and is now QUEUED; otherwise the job is returned
+            unchanged along with the number of active jobs in its session.
+            If require_skeleton is set, callers must check
+            job.results.skeleton_file before the count.
+            
+        Raises:
+            JobNotFoundError: If job doesn't exist
+        """
+        other = aliased(JobModel)
+        conditions = [
+            JobModel.job_id == job_id,
+            ~exists().where(
+                other.session_id == JobModel.session_id,
+                other.status.in_(_ACTIVE_STATUSES)
+            )
+        ]
+        if require_skeleton:
+            conditions.append(JobModel.skeleton_file.isnot(None))
+        
+        claim_stmt = (
+            update(JobModel)
+            .where(*conditions)
+            .values(
+                status=JobStatus.QUEUED.value,
+                progress=0.0,
+                updated_at=datetime.now(timezone.utc)
+            )
+            .returning(JobModel)
+        )
+        
+        while True:
+            db_job = self.db.scalars(
+                claim_stmt, execution_options={"populate_existing": True}
+            ).first()
+            if db_job:
+                self.db.commit()
+                _job_poll_cache.pop(job_id)
+                return self._model_to_pydantic(db_job), 0
+            
+            # Claim failed: find out whether the job is missing, blocked, or
+            # lacks a skeleton
+            db_job = self.db.get(JobModel, job_id, populate_existing=True)
+            if not db_job:
+                raise JobNotFoundError(job_id)
+            
+            active_count = self.db.scalar(
+                select(func.count()).select_from(JobModel).where(
+                    JobModel.session_id == db_job.session_id,
+                    JobModel.status.in_(_ACTIVE_STATUSES)
+                )
+            )
+            if active_count or (require_skeleton and not db_job.skeleton_file):
+                return self._model_to_pydantic(db_job), active_count
+            # An active job finished between the two statements; retry the claim
+    
     def _model_to_pydantic(self, db_job: JobModel) -> Job:
         """
         Convert SQLAlchemy model to Pydantic model.
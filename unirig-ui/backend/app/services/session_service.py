@@ -4,9 +4,11 @@ Handles session creation, validation, expiration, and automatic cleanup.
 """
 
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.db.models import Session as SessionModel
 from app.models.session import SessionModel as SessionPydantic, SessionCreate, SessionUpdate
@@ -16,6 +18,14 @@ from app.utils.errors import SessionNotFoundError
 # Session expiration time (24 hours)
 SESSION_TTL_HOURS = 24
 
+# Sessions expired per UPDATE; each batch commits so write locks stay short
+EXPIRE_BATCH_SIZE = 1000
+
+# Module-level statements so SQLAlchemy's compiled cache is reused across requests
+_GET_SESSION_STMT = select(SessionModel).where(
+    SessionModel.session_id == bindparam("session_id")
+)
+
 
 class SessionService:
     """
@@ -34,7 +44,7 @@ class SessionService:
     
     def create_session(self, session_id: Optional[str] = None) -> SessionPydantic:
         """
-        Create a new session.
+        Create a new session, or touch it if it already exists.
         
         Args:
             session_id: Optional session ID (generated if not provided)
@@ -45,24 +55,38 @@ class SessionService:
         if not session_id:
             session_id = str(uuid.uuid4())
         
-        # Check if session already exists
-        existing = self.db.query(SessionModel).filter(
-            SessionModel.session_id == session_id
-        ).first()
+        # Creates the session, or refreshes last_accessed if it already exists
+        session = self.upsert_and_touch(session_id)
+        self.db.commit()
+        
+        return session
+    
+    def upsert_and_touch(self, session_id: str) -> SessionPydantic:
+        """
+        Create a session or refresh its last_accessed time in one statement.
+        Issues a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
         
-        if existing:
-            # Update last_accessed for existing session
-            return self.update_last_accessed(session_id)
+        The statement is not committed, so callers can commit it together
+        with dependent writes (e.g. job creation) in one transaction.
         
-        # Create new session
-        db_session = SessionModel(
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Created or refreshed SessionPydantic object
+        """
+        stmt = sqlite_insert(SessionModel).values(
             session_id=session_id,
             expired=False
         )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SessionModel.session_id],
+            set_={"last_accessed": datetime.now(timezone.utc)}
+        ).returning(SessionModel)
         
-        self.db.add(db_session)
-        self.db.commit()
-        self.db.refresh(db_session)
+        db_session = self.db.scalars(
+            stmt, execution_options={"populate_existing": True}
+        ).one()
         
         return self._model_to_pydantic(db_session)
     
@@ -79,8 +103,8 @@ class SessionService:
         Raises:
             SessionNotFoundError: If session doesn't exist
         """
-        db_session = self.db.query(SessionModel).filter(
-            SessionModel.session_id == session_id
+        db_session = self.db.scalars(
+            _GET_SESSION_STMT, {"session_id": session_id}
         ).first()
         
         if not db_session:
@@ -102,19 +126,7 @@ class SessionService:
         Raises:
             SessionNotFoundError: If session doesn't exist
         """
-        db_session = self.db.query(SessionModel).filter(
-            SessionModel.session_id == session_id
-        ).first()
-        
-        if not db_session:
-            raise SessionNotFoundError(session_id)
-        
-        db_session.last_accessed = datetime.utcnow()
-        
-        self.db.commit()
-        self.db.refresh(db_session)
-        
-        return self._model_to_pydantic(db_session)
+        return self._update_session(session_id, last_accessed=datetime.now(timezone.utc))
     
     def expire_session(self, session_id: str) -> SessionPydantic:
         """
@@ -129,19 +141,12 @@ class SessionService:
         Raises:
             SessionNotFoundError: If session doesn't exist
         """
-        db_session = self.db.query(SessionModel).filter(
-            SessionModel.session_id == session_id
-        ).first()
-        
-        if not db_session:
-            raise SessionNotFoundError(session_id)
-        
-        db_session.expired = True
-        
-        self.db.commit()
-        self.db.refresh(db_session)
-        
-        return self._model_to_pydantic(db_session)
+        # Expiring is not activity; keep onupdate from bumping the timestamp
+        return self._update_session(
+            session_id,
+            expired=True,
+            last_accessed=SessionModel.last_accessed
+        )
     
     def is_session_expired(self, session_id: str) -> bool:
         """
@@ -156,8 +161,8 @@ class SessionService:
         Raises:
             SessionNotFoundError: If session doesn't exist
         """
-        db_session = self.db.query(SessionModel).filter(
-            SessionModel.session_id == session_id
+        db_session = self.db.scalars(
+            _GET_SESSION_STMT, {"session_id": session_id}
         ).first()
         
         if not db_session:
@@ -169,7 +174,7 @@ class SessionService:
         
         # Check if inactive for more than 24 hours
         expiration_time = db_session.last_accessed + timedelta(hours=SESSION_TTL_HOURS)
-        return datetime.utcnow() > expiration_time
+        return datetime.now(timezone.utc) > expiration_time
     
     def get_expired_sessions(self) -> List[SessionPydantic]:
         """
@@ -178,38 +183,79 @@ class SessionService:
         Returns:
             List of expired SessionPydantic objects
         """
-        cutoff_time = datetime.utcnow() - timedelta(hours=SESSION_TTL_HOURS)
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=SESSION_TTL_HOURS)
         
         # Find sessions that are either:
         # 1. Manually marked as expired
         # 2. Inactive for 24+ hours
-        db_sessions = self.db.query(SessionModel).filter(
-            (SessionModel.expired == True) |
-            (SessionModel.last_accessed < cutoff_time)
+        # Select plain columns; no ORM instances are needed for a read-only list
+        rows = self.db.execute(
+            select(
+                SessionModel.session_id,
+                SessionModel.created_at,
+                SessionModel.last_accessed,
+                SessionModel.expired
+            ).where(
+                (SessionModel.expired == True) |
+                (SessionModel.last_accessed < cutoff_time)
+            )
         ).all()
         
-        return [self._model_to_pydantic(session) for session in db_sessions]
+        return [SessionPydantic.model_construct(**row._mapping) for row in rows]
     
-    def cleanup_expired_sessions(self) -> int:
+    def cleanup_expired_sessions(self) -> List[SessionPydantic]:
         """
         Mark all inactive sessions as expired.
         Does NOT delete files or database records - just marks them.
         Use with FileService.delete_session_files() to remove files.
         
+        Marks and returns the sessions with UPDATE ... RETURNING, so no
+        separate get_expired_sessions() scan is needed to find their files.
+        Runs in batches of EXPIRE_BATCH_SIZE, committing after each, so a
+        large backlog never holds the write lock for long.
+        
         Returns:
-            Number of sessions marked as expired
+            List of SessionPydantic objects newly marked as expired
         """
-        cutoff_time = datetime.utcnow() - timedelta(hours=SESSION_TTL_HOURS)
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=SESSION_TTL_HOURS)
         
-        # Update all sessions that are inactive for 24+ hours
-        count = self.db.query(SessionModel).filter(
+        # Update sessions that are inactive for 24+ hours, one batch at a time
+        batch = select(SessionModel.session_id).where(
             SessionModel.expired == False,
             SessionModel.last_accessed < cutoff_time
-        ).update({"expired": True})
-        
-        self.db.commit()
+        ).limit(EXPIRE_BATCH_SIZE)
+        stmt = update(SessionModel).where(
+            SessionModel.session_id.in_(batch.scalar_subquery())
+        ).values(
+            expired=True,
+            # Expiring is not activity; keep onupdate from bumping the timestamp
+            last_accessed=SessionModel.last_accessed
+        ).returning(
+            SessionModel.session_id,
+            SessionModel.created_at,
+            SessionModel.last_accessed
+        )
         
-        return count
+        rows = []
+        while True:
+            batch_rows = self.db.execute(
+                stmt, execution_options={"synchronize_session": False}
+            ).all()
+            self.db.commit()
+            rows.extend(batch_rows)
+            if len(batch_rows) < EXPIRE_BATCH_SIZE:
+                break
+        
+        # Rows come straight from the database, so skip re-validation
+        return [
+            SessionPydantic.model_construct(
+                session_id=row.session_id,
+                created_at=row.created_at,
+                last_accessed=row.last_accessed,
+                expired=True
+            )
+            for row in rows
+        ]
     
     def delete_session(self, session_id: str) -> bool:
         """
@@ -225,8 +271,8 @@ class SessionService:
         Raises:
             SessionNotFoundError: If session doesn't exist
         """
-        db_session = self.db.query(SessionModel).filter(
-            SessionModel.session_id == session_id
+        db_session = self.db.scalars(
+            _GET_SESSION_STMT, {"session_id": session_id}
         ).first()
         
         if not db_session:
@@ -237,9 +283,42 @@ class SessionService:
         
         return True
     
+    def _update_session(self, session_id: str, **values) -> SessionPydantic:
+        """
+        Apply values to one session and commit, in a single UPDATE ... RETURNING.
+        
+        Args:
+            session_id: Session identifier
+            **values: Column values for the SET clause
+            
+        Returns:
+            Updated SessionPydantic object
+            
+        Raises:
+            SessionNotFoundError: If session doesn't exist
+        """
+        stmt = update(SessionModel).where(
+            SessionModel.session_id == session_id
+        ).values(**values).returning(
+            SessionModel.session_id,
+            SessionModel.created_at,
+            SessionModel.last_accessed,
+            SessionModel.expired
+        )
+        row = self.db.execute(stmt).first()
+        
+        if row is None:
+            self.db.rollback()
+            raise SessionNotFoundError(session_id)
+        
+        self.db.commit()
+        
+        return SessionPydantic.model_construct(**row._mapping)
+    
     def _model_to_pydantic(self, db_session: SessionModel) -> SessionPydantic:
         """
         Convert SQLAlchemy model to Pydantic model.
+        Values come from the database, so validation is skipped.
         
         Args:
             db_session: SQLAlchemy Session model
@@ -247,7 +326,7 @@ class SessionService:
         Returns:
             Pydantic SessionPydantic model
         """
-        return SessionPydantic(
+        return SessionPydantic.model_construct(
             session_id=db_session.session_id,
             created_at=db_session.created_at,
             last_accessed=db_session.last_accessed,
@@ -3,9 +3,15 @@ Celery application configuration.
 Configures Celery with Redis broker and result backend.
 """
 
+import logging
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 from app.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
 
 
 # Create Celery application
@@ -29,6 +35,8 @@ celery.conf.update(
     worker_max_tasks_per_child=50,  # Restart worker after 50 tasks (memory management)
     task_acks_late=True,  # Acknowledge task after completion (retry on failure)
     task_reject_on_worker_lost=True,
+    broker_pool_limit=20,  # Broker connections kept open and reused across tasks
+    broker_connection_retry_on_startup=True,
     # Retry configuration
     task_autoretry_for=(Exception,),
     task_retry_kwargs={"max_retries": 3},
@@ -37,6 +45,19 @@ celery.conf.update(
     task_retry_jitter=True,  # Add randomness to backoff
 )
 
+
+@worker_process_init.connect
+def _reset_db_pool(**kwargs):
+    """
+    Give each worker child its own database connection pool.
+    Children are forked after app.db.database is imported; connections
+    inherited from the parent must not be shared, so drop them from the
+    child's pool (without closing the parent's) and let it open its own.
+    The pool then lives for the child's lifetime, across all its tasks.
+    """
+    engine.dispose(close=False)
+
+
 # Celery Beat schedule for periodic tasks
 celery.conf.beat_schedule = {
     'cleanup-expired-sessions': {
@@ -52,5 +73,5 @@ celery.conf.beat_schedule = {
 # Auto-discover tasks from app.tasks module
 celery.autodiscover_tasks(["app.tasks"])
 
-print("✅ Celery configured successfully with Beat schedule")
+logger.info("Celery configured successfully with Beat schedule")
 
@@ -39,7 +39,7 @@ def check_disk_space():
         usage = DiskMonitor.get_disk_usage()
         logger.info(f"Disk usage: {usage['free_gb']:.2f}GB free ({usage['percent_used']:.1f}% used)")
         
-        if DiskMonitor.is_low_disk_space():
+        if DiskMonitor.is_low_disk_space(usage=usage):
             logger.warning(f"Low disk space detected: {usage['free_gb']:.2f}GB free")
             logger.info("Triggering emergency cleanup")
             results = CleanupService.emergency_cleanup(target_free_gb=10)
@@ -49,7 +49,7 @@ def check_disk_space():
                 "results": results,
                 "disk_usage": usage
             }
-        elif DiskMonitor.needs_warning():
+        elif DiskMonitor.needs_warning(usage=usage):
             logger.warning(f"Disk space warning: {usage['free_gb']:.2f}GB free")
             return {
                 "status": "warning",
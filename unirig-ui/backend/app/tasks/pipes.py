@@ -0,0 +1,97 @@
+"""
+Subprocess pipe helpers for Celery tasks.
+Drains secondary output streams so child processes never block on a full pipe.
+"""
+
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, Optional
+
+# stderr lines kept for error reports; the end of the log is what explains
+# a failure, and a chatty child must not grow worker memory without bound
+STDERR_TAIL_LINES = 200
+
+
+def unbuffered_env() -> Dict[str, str]:
+    """
+    Environment for UniRig child processes with Python output unbuffered.
+
+    A Python child writing to a pipe block-buffers stdout, so progress lines
+    would otherwise reach the task in 8 KiB bursts long after they happen.
+
+    Returns:
+        Copy of os.environ with PYTHONUNBUFFERED set
+    """
+    return {**os.environ, "PYTHONUNBUFFERED": "1"}
+
+
+@contextmanager
+def kill_on_error(process: subprocess.Popen) -> Iterator[subprocess.Popen]:
+    """
+    Kill a child process and its descendants if the block monitoring it
+    is interrupted.
+
+    Celery raises SoftTimeLimitExceeded inside the task when a run overstays
+    task_soft_time_limit; without this the UniRig child would keep running,
+    and holding the GPU, after the task has given up on it. The launch
+    scripts background the inference process and wait on it, so the child
+    must be started with start_new_session=True and its whole process group
+    is killed; killing only the bash wrapper would orphan the grandchild.
+
+    Args:
+        process: Running child process, leader of its own process group
+
+    Yields:
+        The same process
+    """
+    try:
+        yield process
+    except BaseException:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # Group already gone (every member exited and was reaped)
+            pass
+        process.wait()
+        raise
+
+
+class StreamCollector:
+    """
+    Read a text stream to EOF on a daemon thread and keep its last lines.
+
+    Tasks iterate a subprocess's stdout in the foreground; without a reader
+    on stderr, a child that logs more than the pipe buffer (64 KiB on Linux)
+    to stderr blocks forever and the task hangs with it.
+    """
+
+    def __init__(self, stream: IO[str], max_lines: Optional[int] = STDERR_TAIL_LINES):
+        """
+        Start collecting.
+
+        Args:
+            stream: Text stream to drain, e.g. process.stderr
+            max_lines: Number of trailing lines kept (None keeps everything)
+        """
+        self._stream = stream
+        self._lines = deque(maxlen=max_lines)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        for line in self._stream:
+            self._lines.append(line)
+
+    def result(self) -> str:
+        """
+        Wait for the stream to close and return the lines kept from it.
+
+        Returns:
+            Collected stream contents (the last max_lines lines)
+        """
+        self._thread.join()
+        return "".join(self._lines)
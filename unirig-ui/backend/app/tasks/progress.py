@@ -0,0 +1,73 @@
+"""
+Progress reporting helpers for subprocess-driven Celery tasks.
+Coalesces progress parsed from log output into periodic job updates.
+"""
+
+import time
+from typing import Optional
+
+from app.services.job_service import JobService
+
+
+# Minimum time between writes of progress values that do not advance the job
+PROGRESS_FLUSH_INTERVAL_SECONDS = 2.0
+
+
+class ProgressFlusher:
+    """
+    Persist progress values parsed from a job's log output.
+
+    A value that advances the job is written at once, so a phase that is
+    followed by minutes of silent work is shown while that work runs.
+    Repeats of the stored value cost no writes, and values that move back
+    (log lines flapping between phases) are held and written at most once
+    per flush interval.
+    """
+
+    def __init__(
+        self,
+        job_service: JobService,
+        job_id: str,
+        initial: float = 0.0,
+        interval: float = PROGRESS_FLUSH_INTERVAL_SECONDS
+    ):
+        """
+        Initialize the flusher.
+
+        Args:
+            job_service: JobService used to write progress
+            job_id: Job identifier
+            initial: Progress value already stored for the job
+            interval: Minimum seconds between writes that do not advance
+        """
+        self.job_service = job_service
+        self.job_id = job_id
+        self.interval = interval
+        self._written = initial
+        self._pending: Optional[float] = None
+        self._last_flush = time.monotonic()
+
+    def update(self, progress: float) -> None:
+        """
+        Record a new progress value.
+
+        Advances are written immediately; other changes are written once the
+        interval since the last write has elapsed.
+
+        Args:
+            progress: Progress value from 0.0 to 1.0
+        """
+        if progress == self._written:
+            self._pending = None
+            return
+        self._pending = progress
+        if progress > self._written or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the pending progress value, if it differs from the stored one."""
+        pending, self._pending = self._pending, None
+        self._last_flush = time.monotonic()
+        if pending is not None and pending != self._written:
+            self.job_service.update_job(job_id=self.job_id, progress=pending)
+            self._written = pending
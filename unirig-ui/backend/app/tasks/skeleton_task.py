@@ -3,6 +3,7 @@ Skeleton generation Celery task.
 Executes UniRig skeleton prediction using subprocess and tracks progress.
 """
 
+import re
 import subprocess
 import os
 from pathlib import Path
@@ -13,9 +14,16 @@ from app.tasks.celery_app import celery
 from app.db.database import SessionLocal
 from app.services.job_service import JobService
 from app.services.file_service import FileService
+from app.tasks.pipes import StreamCollector, kill_on_error, unbuffered_env
+from app.tasks.progress import ProgressFlusher
 from app.models.job import JobStatus, JobStage
 from app.utils.errors import SkeletonGenerationError
 
+# Log phases (case-insensitive) and the progress each one reports; the
+# group that matched indexes into the progress tuple
+_SKELETON_PHASE_PATTERN = re.compile(r"(loading model)|(processing)|(generating)", re.IGNORECASE)
+_SKELETON_PHASE_PROGRESS = (0.3, 0.5, 0.7)
+
 
 class SkeletonGenerationTask(Task):
     """
@@ -105,27 +113,34 @@ def generate_skeleton(self, job_id: str, input_file: str, seed: int = 42):
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            cwd=str(unirig_root)
+            cwd=str(unirig_root),
+            env=unbuffered_env(),
+            # Own process group, so kill_on_error reaches the UniRig grandchild
+            start_new_session=True
         )
         
+        # Drain stderr concurrently so a noisy child cannot fill the pipe
+        stderr_reader = StreamCollector(process.stderr)
+        
         # Monitor progress by parsing stdout
         stderr_lines = []
-        for line in process.stdout:
-            print(f"[Skeleton] {line.strip()}")
+        progress_flusher = ProgressFlusher(job_service, job_id, initial=0.1)
+        # Kill the child if the task is interrupted (e.g. soft time limit)
+        with kill_on_error(process):
+            for line in process.stdout:
+                print(f"[Skeleton] {line.strip()}")
+                
+                # Update progress based on log output
+                match = _SKELETON_PHASE_PATTERN.search(line)
+                if match:
+                    progress_flusher.update(_SKELETON_PHASE_PROGRESS[match.lastindex - 1])
             
-            # Update progress based on log output
-            if "Loading model" in line or "loading model" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.3)
-            elif "Processing mesh" in line or "processing" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.5)
-            elif "Generating skeleton" in line or "generating" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.7)
-        
-        # Wait for process to complete
-        process.wait()
+            # Wait for process to complete
+            process.wait()
+        progress_flusher.flush()
         
         # Capture stderr for error reporting
-        stderr_output = process.stderr.read()
+        stderr_output = stderr_reader.result()
         if stderr_output:
             stderr_lines.append(stderr_output)
             print(f"[Skeleton STDERR] {stderr_output}")
@@ -3,6 +3,7 @@ Skinning generation Celery task.
 Executes UniRig skinning weight prediction using subprocess.
 """
 
+import re
 import subprocess
 import os
 from pathlib import Path
@@ -13,9 +14,16 @@ from app.tasks.celery_app import celery
 from app.db.database import SessionLocal
 from app.services.job_service import JobService
 from app.services.file_service import FileService
+from app.tasks.pipes import StreamCollector, kill_on_error, unbuffered_env
+from app.tasks.progress import ProgressFlusher
 from app.models.job import JobStatus, JobStage
 from app.utils.errors import SkinningGenerationError
 
+# Log phases (case-insensitive) and the progress each one reports; the
+# group that matched indexes into the progress tuple
+_SKINNING_PHASE_PATTERN = re.compile(r"(loading)|(computing)|(generating)|(saving)", re.IGNORECASE)
+_SKINNING_PHASE_PROGRESS = (0.3, 0.5, 0.7, 0.9)
+
 
 class SkinningGenerationTask(Task):
     """
@@ -102,29 +110,34 @@ def generate_skinning(self, job_id: str, skeleton_file: str):
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            cwd=str(unirig_root)
+            cwd=str(unirig_root),
+            env=unbuffered_env(),
+            # Own process group, so kill_on_error reaches the UniRig grandchild
+            start_new_session=True
         )
         
+        # Drain stderr concurrently so a noisy child cannot fill the pipe
+        stderr_reader = StreamCollector(process.stderr)
+        
         # Monitor progress by parsing stdout
         stderr_lines = []
-        for line in process.stdout:
-            print(f"[Skinning] {line.strip()}")
+        progress_flusher = ProgressFlusher(job_service, job_id, initial=0.1)
+        # Kill the child if the task is interrupted (e.g. soft time limit)
+        with kill_on_error(process):
+            for line in process.stdout:
+                print(f"[Skinning] {line.strip()}")
+                
+                # Update progress based on log output
+                match = _SKINNING_PHASE_PATTERN.search(line)
+                if match:
+                    progress_flusher.update(_SKINNING_PHASE_PROGRESS[match.lastindex - 1])
             
-            # Update progress based on log output
-            if "Loading" in line or "loading" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.3)
-            elif "Computing" in line or "computing" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.5)
-            elif "Generating" in line or "generating" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.7)
-            elif "Saving" in line or "saving" in line.lower():
-                job_service.update_job(job_id=job_id, progress=0.9)
-        
-        # Wait for process to complete
-        process.wait()
+            # Wait for process to complete
+            process.wait()
+        progress_flusher.flush()
         
         # Capture stderr for error reporting
-        stderr_output = process.stderr.read()
+        stderr_output = stderr_reader.result()
         if stderr_output:
             stderr_lines.append(stderr_output)
             print(f"[Skinning STDERR] {stderr_output}")
@@ -3,9 +3,14 @@ Validation utilities for file uploads and data validation.
 Provides helper functions for validating file formats, sizes, and content.
 """
 
+import functools
+import os
 from pathlib import Path
 from typing import Set
 
+# Single characters sanitize_filename replaces with "_", as one translate table
+_DANGEROUS_CHARS_TABLE = str.maketrans(dict.fromkeys('/\\:*?"<>|', '_'))
+
 
 def get_file_extension(filename: str) -> str:
     """
@@ -104,16 +109,13 @@ def sanitize_filename(filename: str) -> str:
         
     Example:
         >>> sanitize_filename("my/../model.obj")
-        "my__model.obj"
+        "my___model.obj"
         >>> sanitize_filename("file:with:colons.fbx")
         "file_with_colons.fbx"
     """
-    # Replace dangerous characters with underscores
-    dangerous_chars = ['/', '\\', '..', ':', '*', '?', '"', '<', '>', '|']
-    sanitized = filename
-    
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '_')
+    # Replace dangerous characters with underscores in one pass; ".." is
+    # the only multi-character sequence, and translating never adds dots
+    sanitized = filename.translate(_DANGEROUS_CHARS_TABLE).replace('..', '_')
     
     # Remove leading/trailing spaces and dots
     sanitized = sanitized.strip('. ')
@@ -125,6 +127,12 @@ def sanitize_filename(filename: str) -> str:
     return sanitized
 
 
+@functools.lru_cache(maxsize=64)
+def _resolved_base_dir(base_dir: str) -> str:
+    """Resolve a base directory once; callers pass a small set of fixed roots."""
+    return str(Path(base_dir).resolve())
+
+
 def is_safe_path(base_dir: str, target_path: str) -> bool:
     """
     Check if target_path is safely contained within base_dir.
@@ -144,11 +152,11 @@ def is_safe_path(base_dir: str, target_path: str) -> bool:
         False
     """
     try:
-        base = Path(base_dir).resolve()
-        target = Path(target_path).resolve()
+        base = _resolved_base_dir(str(base_dir))
+        # The target is user-supplied, so it is resolved on every call
+        target = str(Path(target_path).resolve())
         
-        # Check if target is relative to base
-        target.relative_to(base)
-        return True
+        # Check if target is base or lies below it
+        return os.path.commonpath([base, target]) == base
     except (ValueError, RuntimeError):
         return False
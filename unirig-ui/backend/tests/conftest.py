@@ -14,7 +14,7 @@ from sqlalchemy.orm import sessionmaker, Session
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.database import Base, get_db
+from app.db.database import Base, get_db
 from app.models.session import SessionModel
 from app.models.job import Job
 from app.services.file_service import FileService
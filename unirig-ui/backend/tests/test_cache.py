@@ -0,0 +1,52 @@
+"""
+Unit tests for the in-process TTL cache.
+"""
+
+import time
+
+from app.utils.cache import TTLCache
+
+
+class TestTTLCache:
+    """Test TTL cache expiry and eviction."""
+
+    def test_get_returns_stored_value(self):
+        """Test a stored value is returned before it expires."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+
+    def test_get_missing_returns_default(self):
+        """Test missing keys return the default."""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        assert cache.get("missing") is None
+        assert cache.get("missing", 42) == 42
+
+    def test_entries_expire_after_ttl(self):
+        """Test entries are dropped once their TTL has elapsed."""
+        cache = TTLCache(maxsize=10, ttl=0.01)
+        cache.set("key", "value")
+        time.sleep(0.02)
+
+        assert cache.get("key") is None
+
+    def test_oldest_entry_evicted_when_full(self):
+        """Test the oldest entry is evicted when maxsize is exceeded."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    def test_pop_removes_entry(self):
+        """Test pop removes and returns the entry."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        assert cache.pop("key") == "value"
+        assert cache.get("key") is None
@@ -2,12 +2,15 @@
 Tests for Celery background tasks with mocked subprocess calls.
 """
 
+import hashlib
+import io
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 
 from app.tasks.cleanup import cleanup_expired_sessions, check_disk_space
-from app.tasks.download import download_model_checkpoint
+from app.tasks.download import download_model_checkpoint, download_segments, download_stream
 
 
 class TestCleanupTasks:
@@ -122,6 +125,126 @@ class TestDownloadTasks:
             )
 
 
+def _stream_response(status_code, body, headers=None):
+    """Build a streaming requests response mock serving body."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {"content-length": str(len(body)), **(headers or {})}
+    response.raw = io.BytesIO(body)
+    response.__enter__.return_value = response
+    return response
+
+
+class TestDownloadStreamResume:
+    """Test single-stream downloads resuming a partial file."""
+    
+    @patch("app.tasks.download.requests.get")
+    def test_resume_appends_on_206(self, mock_requests_get, tmp_path):
+        """Test a 206 reply is appended to the partial file, sent with If-Range."""
+        part = tmp_path / "model.pth.part"
+        part.write_bytes(b"hello ")
+        (tmp_path / "model.pth.part.validator").write_text('"v1"')
+        mock_requests_get.return_value = _stream_response(206, b"world")
+        hash_obj = hashlib.sha256()
+        
+        downloaded = download_stream("https://example.com/model.pth", str(part), hash_obj)
+        
+        assert downloaded == 11
+        assert part.read_bytes() == b"hello world"
+        assert hash_obj.hexdigest() == hashlib.sha256(b"hello world").hexdigest()
+        headers = mock_requests_get.call_args.kwargs["headers"]
+        assert headers["Range"] == "bytes=6-"
+        assert headers["If-Range"] == '"v1"'
+        assert not (tmp_path / "model.pth.part.validator").exists()
+    
+    @patch("app.tasks.download.requests.get")
+    def test_restart_when_range_ignored(self, mock_requests_get, tmp_path):
+        """Test a 200 reply to a resume (changed file) replaces the partial file."""
+        part = tmp_path / "model.pth.part"
+        part.write_bytes(b"stale prefix")
+        (tmp_path / "model.pth.part.validator").write_text('"v1"')
+        mock_requests_get.return_value = _stream_response(200, b"new file", {"etag": '"v2"'})
+        hash_obj = hashlib.sha256()
+        
+        downloaded = download_stream("https://example.com/model.pth", str(part), hash_obj)
+        
+        assert downloaded == 8
+        assert part.read_bytes() == b"new file"
+        assert hash_obj.hexdigest() == hashlib.sha256(b"new file").hexdigest()
+    
+    @patch("app.tasks.download.requests.get")
+    def test_restart_on_416(self, mock_requests_get, tmp_path):
+        """Test a 416 reply restarts the download without a Range header."""
+        part = tmp_path / "model.pth.part"
+        part.write_bytes(b"too long prefix")
+        (tmp_path / "model.pth.part.validator").write_text('"v1"')
+        mock_requests_get.side_effect = [
+            _stream_response(416, b""),
+            _stream_response(200, b"fresh"),
+        ]
+        
+        downloaded = download_stream("https://example.com/model.pth", str(part))
+        
+        assert downloaded == 5
+        assert part.read_bytes() == b"fresh"
+        assert "headers" not in mock_requests_get.call_args_list[1].kwargs
+    
+    @patch("app.tasks.download.requests.get")
+    def test_no_resume_without_validator_or_checksum(self, mock_requests_get, tmp_path):
+        """Test a partial file is not resumed when nothing could detect a changed file."""
+        part = tmp_path / "model.pth.part"
+        part.write_bytes(b"unknown prefix")
+        mock_requests_get.return_value = _stream_response(200, b"whole")
+        
+        downloaded = download_stream("https://example.com/model.pth", str(part))
+        
+        assert downloaded == 5
+        assert part.read_bytes() == b"whole"
+        assert "headers" not in mock_requests_get.call_args.kwargs
+    
+    @patch("app.tasks.download.requests.get")
+    def test_fresh_download_stores_validator(self, mock_requests_get, tmp_path):
+        """Test an interrupted fresh download leaves its ETag for If-Range."""
+        part = tmp_path / "model.pth.part"
+        response = _stream_response(200, b"", {"etag": '"v1"'})
+        response.raw = Mock()
+        response.raw.read.side_effect = ConnectionError("reset")
+        mock_requests_get.return_value = response
+        
+        with pytest.raises(ConnectionError):
+            download_stream("https://example.com/model.pth", str(part))
+        
+        assert (tmp_path / "model.pth.part.validator").read_text() == '"v1"'
+
+
+class TestDownloadSegments:
+    """Test parallel Range segment downloads."""
+    
+    @patch("app.tasks.download.requests.get")
+    def test_failed_segment_cancels_the_others(self, mock_requests_get, tmp_path):
+        """Test one failing segment stops the rest instead of waiting for them."""
+        class SlowRaw:
+            def read(self, size):
+                time.sleep(0.01)
+                return b"x"
+        
+        def fake_get(url, headers, **kwargs):
+            if headers["Range"].startswith("bytes=0-"):
+                return _stream_response(200, b"")  # Range ignored
+            response = _stream_response(206, b"")
+            response.raw = SlowRaw()
+            return response
+        
+        mock_requests_get.side_effect = fake_get
+        
+        started = time.monotonic()
+        with pytest.raises(IOError, match="ignored range"):
+            download_segments("https://example.com/model.pth", str(tmp_path / "model.part"), 8 * 1000)
+        
+        # Each slow segment would take about 10s to finish on its own
+        assert time.monotonic() - started < 2
+
+
 class TestSkeletonGenerationTask:
     """Test skeleton generation Celery task."""
     
@@ -40,8 +40,9 @@ class TestSessionFileCleanup:
 class TestSecureDeletion:
     """Test secure file deletion with shred."""
     
+    @patch("app.services.cleanup_service._shred_is_effective", return_value=True)
     @patch("app.services.cleanup_service.subprocess.run")
-    def test_secure_delete_file(self, mock_subprocess, temp_upload_dir):
+    def test_secure_delete_file(self, mock_subprocess, mock_shred_effective, temp_upload_dir):
         """Test secure file deletion using shred."""
         test_file = temp_upload_dir / "sensitive.obj"
         test_file.write_text("sensitive data")
@@ -70,6 +71,18 @@ class TestSecureDeletion:
         # File should still be deleted via fallback
         assert not test_file.exists()
     
+    @patch("app.services.cleanup_service._shred_is_effective", return_value=False)
+    @patch("app.services.cleanup_service.subprocess.run")
+    def test_secure_delete_skips_shred_on_ssd(self, mock_subprocess, mock_shred_effective, temp_upload_dir):
+        """Test that files on SSD/copy-on-write filesystems are unlinked without shred."""
+        test_file = temp_upload_dir / "model.obj"
+        test_file.write_text("data")
+        
+        CleanupService.secure_delete_file(str(test_file))
+        
+        mock_subprocess.assert_not_called()
+        assert not test_file.exists()
+    
     def test_secure_delete_directory(self, temp_upload_dir):
         """Test secure deletion of entire directory."""
         test_dir = temp_upload_dir / "session_dir"
@@ -146,6 +159,42 @@ class TestEmergencyCleanup:
         # Older session should be cleaned first
         # (actual behavior depends on disk space, but test the logic)
         assert cleanup_service is not None
+    
+    def test_emergency_cleanup_pages_past_failed_sessions(self, db_engine):
+        """Test sessions that fail to delete do not stop newer ones being cleaned."""
+        from sqlalchemy.orm import sessionmaker
+        from app.db.models import Session as SessionRecord
+        
+        TestingSessionLocal = sessionmaker(bind=db_engine, expire_on_commit=False)
+        now = datetime.utcnow()
+        with TestingSessionLocal() as db:
+            for i in range(6):
+                db.add(SessionRecord(session_id=f"s{i}", last_accessed=now - timedelta(hours=10 - i)))
+            db.commit()
+        
+        failing = {"s0", "s1", "s2", "s3"}
+        tried = []
+        freed = []
+        
+        def fake_cleanup_sessions(session_ids, db=None):
+            tried.extend(session_ids)
+            freed.extend(sid for sid in session_ids if sid not in failing)
+            return [(sid, sid not in failing, "failed" if sid in failing else "ok") for sid in session_ids]
+        
+        def fake_disk_usage(path="/"):
+            return {"free_gb": 20.0 if freed else 1.0}
+        
+        with patch("app.services.cleanup_service.SessionLocal", TestingSessionLocal), \
+                patch.object(CleanupService, "EMERGENCY_FETCH_LIMIT", 2), \
+                patch.object(CleanupService, "EMERGENCY_BATCH_SIZE", 1), \
+                patch.object(CleanupService, "cleanup_sessions", side_effect=fake_cleanup_sessions), \
+                patch.object(DiskMonitor, "get_disk_usage", side_effect=fake_disk_usage):
+            results = CleanupService.emergency_cleanup(target_free_gb=10)
+        
+        # The four oldest fail and stay in the table; paging still reaches s4
+        assert tried == ["s0", "s1", "s2", "s3", "s4"]
+        assert results["sessions_cleaned"] == 1
+        assert len(results["errors"]) == 4
 
 
 class TestDiskMonitoring:
@@ -0,0 +1,59 @@
+"""
+Unit tests for subprocess pipe helpers used by the UniRig tasks.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.tasks.pipes import kill_on_error
+
+
+def _is_running(pid: int) -> bool:
+    """Check a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc")
+class TestKillOnError:
+    """Test the child process group is killed when monitoring is interrupted."""
+
+    def test_kills_backgrounded_grandchild(self, tmp_path):
+        """Test a grandchild backgrounded by the launch script is killed too."""
+        script = tmp_path / "launch.sh"
+        # Same shape as launch/inference/*.sh: eval "$cmd &"; wait
+        script.write_text('cmd="sleep 30"\necho $$\neval "$cmd &"\necho $!\nwait\n')
+        process = subprocess.Popen(
+            ["bash", str(script)],
+            stdout=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+        process.stdout.readline()
+        grandchild = int(process.stdout.readline())
+
+        with pytest.raises(KeyboardInterrupt):
+            with kill_on_error(process):
+                raise KeyboardInterrupt
+
+        assert process.returncode == -9
+        # The orphaned grandchild is reaped by init, which may take a moment
+        deadline = time.monotonic() + 5
+        while _is_running(grandchild) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not _is_running(grandchild)
+
+    def test_leaves_finished_process_alone(self):
+        """Test a process that exits normally is not signalled."""
+        process = subprocess.Popen(["true"], start_new_session=True)
+        with kill_on_error(process):
+            process.wait()
+
+        assert process.returncode == 0
@@ -7,6 +7,8 @@ import pytest
 from fastapi import status
 from io import BytesIO
 
+from app.utils.validation import is_safe_path
+
 
 class TestPathTraversalAttacks:
     """Test prevention of path traversal attacks."""
@@ -50,6 +52,14 @@ class TestPathTraversalAttacks:
         )
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_is_safe_path_rejects_sibling_prefix(self, tmp_path):
+        """Test a sibling directory sharing the base name prefix is not inside base."""
+        base = tmp_path / "session1"
+        
+        assert is_safe_path(str(base), str(base / "model.obj"))
+        assert not is_safe_path(str(base), str(tmp_path / "session10" / "model.obj"))
+        assert not is_safe_path(str(base), str(base / ".." / "session2" / "model.obj"))
 
 
 class TestMaliciousFileUploads: